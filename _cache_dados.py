@@ -0,0 +1,36 @@
+"""
+Cache, por processo, dos dados do questionário compartilhados entre os scripts de gráficos
+
+Quando vários geradores rodam no mesmo processo (ex.: um driver que importa e chama
+cada script), a planilha é lida e mapeada uma única vez. Os objetos retornados são
+compartilhados: não devem ser modificados pelos chamadores.
+"""
+
+from functools import lru_cache
+from typing import Dict
+
+from analise_likert_riscos import AnalisadorRiscosLikert
+
+
+@lru_cache(maxsize=1)
+def obter_analisador() -> AnalisadorRiscosLikert:
+    """
+    Retorna o analisador com os dados do questionário já carregados
+
+    Returns:
+        AnalisadorRiscosLikert compartilhado (dados_brutos preenchido)
+    """
+    analisador = AnalisadorRiscosLikert()
+    analisador.carregar_dados()
+    return analisador
+
+
+@lru_cache(maxsize=1)
+def obter_mapeamento() -> Dict[str, Dict]:
+    """
+    Retorna o mapeamento de variáveis por dimensão e período do analisador compartilhado
+
+    Returns:
+        Dicionário dimensão -> período -> colunas (ver mapear_variaveis_por_dimensao)
+    """
+    return obter_analisador().mapear_variaveis_por_dimensao()
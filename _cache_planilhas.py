@@ -0,0 +1,72 @@
+"""
+Cópia em pickle das planilhas Excel do projeto, reaproveitada entre execuções
+
+Módulo leve (só pandas), usado tanto pelos scripts de gráficos quanto pelos
+utilitários e pelo processador de dados do painel.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Diretório das cópias em pickle das planilhas já lidas (ver ler_excel_com_cache),
+# ancorado no diretório do projeto para não depender do diretório corrente
+DIRETORIO_CACHE = Path(__file__).resolve().parent / '.cache'
+
+
+def salvar_pickle_atomico(objeto, caminho) -> None:
+    """
+    Grava um objeto em pickle de forma atômica
+
+    O conteúdo vai primeiro para um arquivo temporário no mesmo diretório e só
+    então substitui o destino (os.replace); uma execução interrompida nunca deixa
+    um pickle truncado no lugar do cache.
+
+    Args:
+        objeto: Objeto a serializar (DataFrame ou qualquer objeto serializável)
+        caminho: Caminho final do pickle
+    """
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=caminho.parent, prefix=f".{caminho.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(descritor, 'wb') as arquivo:
+            pickle.dump(objeto, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+def ler_excel_com_cache(excel_file, usecols=None) -> pd.DataFrame:
+    """
+    Lê a primeira planilha de um arquivo Excel, reaproveitando uma cópia em pickle
+
+    A planilha é convertida uma única vez; o pickle só é usado enquanto for mais
+    recente que o arquivo Excel. Cada arquivo (pelo caminho absoluto) e cada
+    seleção de colunas têm o seu próprio pickle, mesmo que outro arquivo em outra
+    pasta tenha o mesmo nome.
+
+    Args:
+        excel_file: Caminho do arquivo Excel
+        usecols: Lista de colunas a ler (índices ou nomes, como em pd.read_excel);
+            None lê todas
+
+    Returns:
+        DataFrame com os dados da planilha
+    """
+    excel_file = Path(excel_file).resolve()
+    identificacao = str(excel_file) if usecols is None else f"{excel_file}|{list(usecols)!r}"
+    chave = hashlib.sha1(identificacao.encode('utf-8')).hexdigest()[:16]
+    caminho_cache = DIRETORIO_CACHE / f"{excel_file.name}.{chave}.pkl"
+    if (caminho_cache.exists()
+            and excel_file.stat().st_mtime <= caminho_cache.stat().st_mtime):
+        return pd.read_pickle(caminho_cache)
+
+    df = pd.read_excel(excel_file, usecols=usecols)
+    salvar_pickle_atomico(df, caminho_cache)
+    return df
@@ -0,0 +1,292 @@
+"""
+Geração dos gráficos agrupados temporais (barras por período) de uma ou mais dimensões
+
+Corpo comum dos scripts gerar_graficos_agrupados_<dimensao>.py: cada script só
+descreve a sua dimensão (DimensaoAgrupada) e chama gerar_graficos_agrupados. Várias
+dimensões passadas juntas são geradas em um único pool de processos, que recebe o
+DataFrame uma só vez.
+"""
+
+import os
+import re
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, List, NamedTuple
+
+import matplotlib
+matplotlib.use("Agg")  # renderização só em arquivo; processos filhos não iniciam backend gráfico
+import matplotlib.pyplot as plt
+
+from analise_likert_riscos import AnalisadorRiscosLikert
+from _cache_dados import obter_analisador, obter_mapeamento
+from _publicacao import publicar_grafico
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Diretórios de saída comuns a todas as dimensões
+DIRETORIO_COMUM = 'quarto/assets/graficos_agrupados'
+DIRETORIO_TESTE = 'outputs/teste'
+
+# Código numérico no início do nome da coluna (ex.: "2.1")
+_CODIGO_RE = re.compile(r'^(\d+\.\d+)')
+
+# Analisador, eixo de desenho e opção de saída em outputs/teste, montados uma vez
+# por processo do pool (definidos em _inicializar_processo)
+_analisador_processo = None
+_eixo_processo = None
+_manter_saida_teste = False
+
+
+class DimensaoAgrupada(NamedTuple):
+    """Descrição de uma dimensão para a geração dos gráficos agrupados"""
+    dimensao: str  # Chave no mapeamento (ex.: 'Ambiental')
+    codigos: List[str]  # Códigos das variáveis, na ordem de geração (ex.: ['2.1', ...])
+    subdiretorio: str  # Pasta da dimensão em quarto/assets (ex.: 'ambientais')
+    rotulo: str  # Usado nas mensagens de progresso (ex.: 'ambientais')
+    titulos: Dict[str, str] = {}  # Títulos que substituem o nome da coluna, por código
+
+
+def indexar_variaveis_por_codigo(mapeamento_dimensao):
+    """
+    Indexa as colunas de uma dimensão pelo código numérico da variável
+
+    Args:
+        mapeamento_dimensao: Períodos -> colunas da dimensão (de mapear_variaveis_por_dimensao)
+
+    Returns:
+        Dicionário código (ex: '2.1') -> lista de (período, coluna), na ordem do mapeamento
+    """
+    indice = defaultdict(list)
+    for periodo, variaveis in mapeamento_dimensao.items():
+        for var in variaveis:
+            match = _CODIGO_RE.match(var)
+            if match:
+                indice[match.group(1)].append((periodo, var))
+    return indice
+
+
+def nome_arquivo_grafico(codigo):
+    """Nome do PNG do gráfico agrupado de uma variável (ex.: '2.1' -> grafico_agrupado_2_1_temporal.png)."""
+    return f"grafico_agrupado_{codigo.replace('.', '_')}_temporal.png"
+
+
+def criar_grafico_agrupado(analisador, colunas_periodos, variavel, caminhos_saida, titulo=None, ax=None):
+    """
+    Cria o gráfico agrupado temporal de uma variável
+
+    Args:
+        analisador: AnalisadorRiscosLikert com dados_brutos já atribuídos
+        colunas_periodos: Lista de (período, coluna) da variável (de indexar_variaveis_por_codigo)
+        variavel: Código da variável (ex: '2.1')
+        caminhos_saida: Caminhos do PNG, em diretórios já existentes; o gráfico é
+            renderizado no primeiro e publicado nos demais (ver publicar_grafico)
+        titulo: Título no lugar do nome completo da coluna (opcional)
+        ax: Eixo reaproveitado entre variáveis (opcional)
+
+    Returns:
+        True se sucesso, False se erro
+    """
+    try:
+        df = analisador.dados_brutos
+
+        # Dados da variável por período (primeira coluna de cada período)
+        dados_periodos = {}
+        nome_completo_variavel = None
+        for periodo, var in colunas_periodos:
+            if periodo not in dados_periodos:
+                dados_periodos[periodo] = df[var].to_numpy()
+                if nome_completo_variavel is None:
+                    nome_completo_variavel = var
+
+        if not dados_periodos:
+            logger.warning(f"Variável {variavel} não encontrada nos dados")
+            return False
+
+        if titulo is not None:
+            nome_completo_variavel = titulo
+
+        # Renderizar uma única vez, no primeiro caminho
+        caminho_principal = caminhos_saida[0]
+        sucesso = analisador.gerar_grafico_barras_agrupado_temporal(
+            dados_periodos, nome_completo_variavel, caminho_principal, ax=ax
+        )
+
+        # Demais destinos apontam para o mesmo arquivo
+        if sucesso:
+            for destino in caminhos_saida[1:]:
+                publicar_grafico(caminho_principal, destino)
+
+        return sucesso
+
+    except Exception as e:
+        logger.error(f"Erro ao criar gráfico agrupado para {variavel}: {e}")
+        return False
+
+
+def _inicializar_processo(df, manter_saida_teste):
+    """Monta o analisador e a figura uma única vez por processo do pool"""
+    global _analisador_processo, _eixo_processo, _manter_saida_teste
+    _manter_saida_teste = manter_saida_teste
+    # Uma única figura por processo, limpa e redesenhada a cada variável
+    _, _eixo_processo = plt.subplots(figsize=(14, 8))
+    _analisador_processo = AnalisadorRiscosLikert()
+    _analisador_processo.dados_brutos = df
+
+
+def _processar_variavel(tarefa):
+    """
+    Gera e publica o gráfico de uma variável dentro de um processo do pool
+
+    Args:
+        tarefa: (código, [(período, coluna)], título ou None, pasta da dimensão,
+            True se o gráfico já está publicado em todos os destinos e não deve ser refeito)
+
+    Returns:
+        Tupla (status, mensagens): status True se o gráfico foi gerado, False se já
+        existia e None em caso de erro; as mensagens de progresso são impressas pelo
+        processo principal na ordem original
+    """
+    var, colunas_periodos, titulo, diretorio_dimensao, ja_publicado = tarefa
+    mensagens = [f"\nProcessando variável {var}..."]
+
+    nome_arquivo = nome_arquivo_grafico(var)
+    caminhos_saida = [
+        os.path.join(DIRETORIO_COMUM, nome_arquivo),
+        os.path.join(diretorio_dimensao, nome_arquivo),
+    ]
+    if _manter_saida_teste:
+        caminhos_saida.append(os.path.join(DIRETORIO_TESTE, nome_arquivo))
+
+    # Gráfico já publicado em todos os destinos: nada a refazer
+    if ja_publicado:
+        mensagens.append(f"  Grafico {var} ja existe, mantido")
+        return False, mensagens
+
+    try:
+        sucesso = criar_grafico_agrupado(
+            _analisador_processo, colunas_periodos, var, caminhos_saida,
+            titulo=titulo, ax=_eixo_processo
+        )
+
+        if sucesso:
+            mensagens.append(f"  OK Grafico {var} gerado com sucesso")
+            for caminho in caminhos_saida:
+                mensagens.append(f"  Salvo em {caminho}")
+            return True, mensagens
+        mensagens.append(f"  ERRO: Falha ao gerar grafico {var}")
+
+    except Exception as e:
+        mensagens.append(f"  ERRO: Excecao ao processar variavel {var}: {str(e)}")
+
+    return None, mensagens
+
+
+def gerar_para_dimensoes(df, mapeamento, dimensoes, manter_saida_teste=False, forcar=False):
+    """
+    Gera os gráficos agrupados das dimensões informadas em um único pool de processos
+
+    Args:
+        df: DataFrame do questionário (dados_brutos do analisador)
+        mapeamento: Dimensão -> período -> colunas (de mapear_variaveis_por_dimensao)
+        dimensoes: Lista de DimensaoAgrupada, na ordem de geração
+        manter_saida_teste: Também publica cada PNG em outputs/teste
+        forcar: Regenera mesmo os gráficos que já existem em todos os destinos
+
+    Returns:
+        Lista de (dimensão, código, nome do arquivo, status) na ordem de geração; status
+        True se o gráfico foi gerado, False se já existia e None em caso de erro
+    """
+    # Diretórios de saída, criados uma única vez antes de distribuir as variáveis
+    diretorios = [DIRETORIO_COMUM]
+    diretorios += [os.path.join('quarto', 'assets', d.subdiretorio) for d in dimensoes]
+    if manter_saida_teste:
+        diretorios.append(DIRETORIO_TESTE)
+    for diretorio in diretorios:
+        os.makedirs(diretorio, exist_ok=True)
+
+    # Cada diretório é listado uma única vez (em vez de um stat por destino e variável)
+    existentes = {} if forcar else {diretorio: set(os.listdir(diretorio)) for diretorio in diretorios}
+
+    # Tarefas de todas as dimensões em uma única lista; cada uma leva só as suas colunas
+    tarefas = []
+    for d in dimensoes:
+        indice = indexar_variaveis_por_codigo(mapeamento.get(d.dimensao, {}))
+        diretorio_dimensao = os.path.join('quarto', 'assets', d.subdiretorio)
+        destinos = [DIRETORIO_COMUM, diretorio_dimensao]
+        if manter_saida_teste:
+            destinos.append(DIRETORIO_TESTE)
+        for codigo in d.codigos:
+            nome_arquivo = nome_arquivo_grafico(codigo)
+            ja_publicado = not forcar and all(nome_arquivo in existentes[destino] for destino in destinos)
+            tarefas.append((codigo, indice.get(codigo, []), d.titulos.get(codigo),
+                            diretorio_dimensao, ja_publicado))
+
+    # Cada variável é independente: renderiza em paralelo, um processo por núcleo.
+    # As mensagens de cada dimensão são escritas de uma só vez no stdout, na ordem original
+    situacoes = []
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_inicializar_processo,
+                             initargs=(df, manter_saida_teste)) as executor:
+        resultados = executor.map(_processar_variavel, tarefas)
+        for d in dimensoes:
+            linhas = [f"Gerando graficos agrupados para variaveis {d.rotulo}..."]
+            for codigo, (status, mensagens) in zip(d.codigos, islice(resultados, len(d.codigos))):
+                situacoes.append((d.dimensao, codigo, nome_arquivo_grafico(codigo), status))
+                linhas.extend(mensagens)
+            linhas.append("\nProcessamento concluido!")
+            linhas.append(f"Total de variaveis processadas: {len(d.codigos)}")
+            sys.stdout.write("\n".join(linhas) + "\n")
+            sys.stdout.flush()
+
+    return situacoes
+
+
+def gerar_para_dimensao(df, mapeamento, dimensao, codigos, asset_subdir, rotulo=None,
+                        titulos=None, manter_saida_teste=False, forcar=False):
+    """
+    Gera os gráficos agrupados de uma única dimensão
+
+    Args:
+        df: DataFrame do questionário (dados_brutos do analisador)
+        mapeamento: Dimensão -> período -> colunas (de mapear_variaveis_por_dimensao)
+        dimensao: Chave da dimensão no mapeamento (ex.: 'Ambiental')
+        codigos: Códigos das variáveis (ex.: ['2.1', '2.2'])
+        asset_subdir: Pasta da dimensão em quarto/assets (ex.: 'ambientais')
+        rotulo: Nome usado nas mensagens de progresso (padrão: asset_subdir)
+        titulos: Títulos que substituem o nome da coluna, por código (opcional)
+        manter_saida_teste: Também publica cada PNG em outputs/teste
+        forcar: Regenera mesmo os gráficos que já existem em todos os destinos
+
+    Returns:
+        Lista de (dimensão, código, nome do arquivo, status) de gerar_para_dimensoes
+    """
+    configuracao = DimensaoAgrupada(dimensao, list(codigos), asset_subdir,
+                                    rotulo or asset_subdir, titulos or {})
+    return gerar_para_dimensoes(df, mapeamento, [configuracao],
+                         manter_saida_teste=manter_saida_teste, forcar=forcar)
+
+
+def gerar_graficos_agrupados(dimensoes, manter_saida_teste=False, forcar=False):
+    """
+    Carrega o questionário compartilhado e gera os gráficos agrupados das dimensões
+
+    Args:
+        dimensoes: Lista de DimensaoAgrupada, na ordem de geração
+        manter_saida_teste: Também publica cada PNG em outputs/teste
+        forcar: Regenera mesmo os gráficos que já existem em todos os destinos
+
+    Returns:
+        Lista de (dimensão, código, nome do arquivo, status) de gerar_para_dimensoes;
+        vazia se os dados não puderem ser carregados
+    """
+    # Carregar dados (compartilhados com os demais scripts do mesmo processo)
+    try:
+        df = obter_analisador().dados_brutos
+    except Exception:
+        print("Erro: Não foi possível carregar os dados")
+        return []
+
+    return gerar_para_dimensoes(df, obter_mapeamento(), dimensoes,
+                         manter_saida_teste=manter_saida_teste, forcar=forcar)
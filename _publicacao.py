@@ -0,0 +1,35 @@
+"""
+Publicação dos PNGs gerados nos diretórios de destino do relatório
+
+Um mesmo gráfico costuma ir para mais de um diretório (comum, da dimensão e,
+opcionalmente, outputs/teste); ele é renderizado uma única vez e publicado nos
+demais destinos por publicar_grafico. PNG_PIL_KWARGS reúne as opções de gravação
+dos PNGs, comuns a todos os scripts de gráficos.
+"""
+
+import os
+import shutil
+
+# Compressão zlib rápida para os PNGs de 300 dpi (arquivo maior, gravação bem mais rápida)
+PNG_PIL_KWARGS = {'compress_level': 1}
+
+
+def publicar_grafico(origem, destino):
+    """
+    Publica o gráfico gerado em um diretório de destino
+
+    Usa hard link quando origem e destino estão no mesmo sistema de arquivos
+    (nenhum byte é copiado); entre dispositivos diferentes, recai em cópia.
+
+    Args:
+        origem: Caminho do PNG gerado
+        destino: Caminho de publicação (diretório já existente)
+    """
+    try:
+        os.remove(destino)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(origem, destino)
+    except OSError:
+        shutil.copy2(origem, destino)
@@ -7,6 +7,8 @@ organizados por dimensões: Econômica, Ambiental, Geopolítica, Social e Tecnol
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # gráficos só são gravados em arquivo, sem backend interativo
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
@@ -15,6 +17,9 @@ from typing import Dict, List, Tuple, Any
 import logging
 from pathlib import Path
 
+from _cache_planilhas import ler_excel_com_cache
+from _publicacao import PNG_PIL_KWARGS
+
 # Configuração
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -55,6 +60,7 @@ class AnalisadorRiscosLikert:
         self.excel_file = excel_file
         self.dados_brutos = None
         self.apendice_variaveis = {}  # Armazenará informações completas das variáveis
+        self._labels_sucintos = {}  # (coluna, incluir_numero) -> rótulo já gerado
         self.dimensoes = {
             'Economica': {'prefixo': '1.', 'pasta': 'graficos_economicos'},
             'Ambiental': {'prefixo': '2.', 'pasta': 'graficos_ambientais'},
@@ -88,6 +94,14 @@ class AnalisadorRiscosLikert:
         Returns:
             String com rótulo sucinto
         """
+        chave = (coluna_original, incluir_numero)
+        label = self._labels_sucintos.get(chave)
+        if label is None:
+            label = self._labels_sucintos[chave] = self._criar_label_sucinto(coluna_original, incluir_numero)
+        return label
+    
+    def _criar_label_sucinto(self, coluna_original: str, incluir_numero: bool) -> str:
+        """Monta o rótulo sucinto (ver gerar_label_sucinto, que memoriza o resultado)"""
         # Extrair número e descrição
         match = re.match(r'^(\d+\.\d+)\s*(.+?)\s*\[.*?\]\s*$', coluna_original)
         if match:
@@ -241,7 +255,7 @@ class AnalisadorRiscosLikert:
         """
         try:
             logger.info(f"Carregando dados de {self.excel_file}")
-            self.dados_brutos = pd.read_excel(self.excel_file)
+            self.dados_brutos = ler_excel_com_cache(self.excel_file)
             logger.info(f"Dados carregados: {self.dados_brutos.shape[0]} linhas, {self.dados_brutos.shape[1]} colunas")
             return self.dados_brutos
         except Exception as e:
@@ -433,7 +447,7 @@ class AnalisadorRiscosLikert:
             plt.tight_layout()
             
             # Salvar gráfico
-            plt.savefig(caminho_salvar, dpi=300, bbox_inches='tight')
+            plt.savefig(caminho_salvar, dpi=300, bbox_inches='tight', pil_kwargs=PNG_PIL_KWARGS)
             plt.close()
             
             logger.info(f"Gráfico salvo: {caminho_salvar}")
@@ -525,7 +539,7 @@ class AnalisadorRiscosLikert:
             plt.legend(handles=legend_elements, loc='lower right')
             
             plt.tight_layout()
-            plt.savefig(caminho_salvar, dpi=300, bbox_inches='tight')
+            plt.savefig(caminho_salvar, dpi=300, bbox_inches='tight', pil_kwargs=PNG_PIL_KWARGS)
             plt.close()
             
             logger.info(f"Gráfico comparativo salvo: {caminho_salvar}")
@@ -590,7 +604,7 @@ class AnalisadorRiscosLikert:
             plt.legend()
             
             plt.tight_layout()
-            plt.savefig(caminho_salvar, dpi=300, bbox_inches='tight')
+            plt.savefig(caminho_salvar, dpi=300, bbox_inches='tight', pil_kwargs=PNG_PIL_KWARGS)
             plt.close()
             
             logger.info(f"Boxplot salvo: {caminho_salvar}")
@@ -662,7 +676,7 @@ class AnalisadorRiscosLikert:
                 ax2.annotate(f'{y:.1f}%', (x, y), textcoords="offset points", xytext=(0,10), ha='center')
             
             plt.tight_layout()
-            plt.savefig(caminho_salvar, dpi=300, bbox_inches='tight')
+            plt.savefig(caminho_salvar, dpi=300, bbox_inches='tight', pil_kwargs=PNG_PIL_KWARGS)
             plt.close()
             
             logger.info(f"Gráfico de evolução salvo: {caminho_salvar}")
@@ -987,14 +1001,16 @@ class AnalisadorRiscosLikert:
         self.gerar_relatorio_consolidado(mapeamento)
     
     def gerar_grafico_barras_agrupado_temporal(self, dados_periodos: Dict, nome_variavel: str, 
-                                             caminho_salvar: str) -> bool:
+                                             caminho_salvar: str, ax=None) -> bool:
         """
         Gera gráfico de barras agrupado por período temporal para uma variável
         
         Args:
-            dados_periodos: Dicionário com dados por período temporal
+            dados_periodos: Dicionário período -> respostas (Series ou array NumPy)
             nome_variavel: Nome base da variável
             caminho_salvar: Caminho para salvar o gráfico
+            ax: Eixo a reaproveitar (opcional); é limpo antes do desenho e sua
+                figura não é fechada, permitindo reutilizá-la entre variáveis
             
         Returns:
             True se sucesso, False se erro
@@ -1010,14 +1026,17 @@ class AnalisadorRiscosLikert:
             
             for i, periodo in enumerate(periodos_ordenados):
                 if periodo in dados_periodos:
-                    stats = self.analisar_frequencias_likert(dados_periodos[periodo])
-                    if stats:
+                    # Só as contagens por nível são usadas: np.bincount sobre os valores numéricos
+                    valores = pd.to_numeric(np.asarray(dados_periodos[periodo]).ravel(), errors='coerce')
+                    valores = valores[~np.isnan(valores)]
+                    total = len(valores)
+                    if total > 0:
+                        # Apenas respostas exatamente iguais a 1..5 entram nas contagens
+                        na_escala = valores[(valores >= 1) & (valores <= 5) & (valores == np.floor(valores))]
+                        contagens = np.bincount(na_escala.astype(np.int64), minlength=6)
+                        
                         # Converter para percentuais
-                        total = stats['total_respostas']
-                        percentuais = {}
-                        for nivel in range(1, 6):
-                            freq_abs = stats['frequencias_absolutas'].get(nivel, 0)
-                            percentuais[nivel] = (freq_abs / total) * 100 if total > 0 else 0
+                        percentuais = {nivel: (contagens[nivel] / total) * 100 for nivel in range(1, 6)}
                         
                         dados_grafico[periodo] = {
                             'percentuais': percentuais,
@@ -1029,8 +1048,20 @@ class AnalisadorRiscosLikert:
                 logger.warning(f"Sem dados válidos para gráfico agrupado: {nome_variavel}")
                 return False
             
-            # Criar gráfico
-            plt.figure(figsize=(14, 8))
+            # Criar gráfico (ou reaproveitar a figura recebida)
+            figura_propria = ax is None
+            if figura_propria:
+                fig, ax = plt.subplots(figsize=(14, 8))
+            else:
+                fig = ax.figure
+                ax.clear()
+                for texto in list(fig.texts):
+                    texto.remove()
+                # tight_layout parte das margens padrão, como em uma figura nova
+                fig.subplots_adjust(**{
+                    margem: plt.rcParams[f'figure.subplot.{margem}']
+                    for margem in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+                })
             
             # Configurar barras agrupadas
             largura_barra = 0.25
@@ -1041,7 +1072,7 @@ class AnalisadorRiscosLikert:
                 offset = (i - 1) * largura_barra  # Centralizar grupos
                 valores = [dados['percentuais'].get(nivel, 0) for nivel in range(1, 6)]
                 
-                bars = plt.bar(posicoes + offset, valores, largura_barra, 
+                bars = ax.bar(posicoes + offset, valores, largura_barra, 
                              label=dados['label'], color=dados['cor'], 
                              alpha=0.8, edgecolor='black', linewidth=1)
                 
@@ -1049,7 +1080,7 @@ class AnalisadorRiscosLikert:
                 for bar, valor in zip(bars, valores):
                     if valor > 0:  # Só mostrar se houver valor
                         height = bar.get_height()
-                        plt.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                        ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
                                 f'{valor:.1f}%', ha='center', va='bottom', 
                                 fontweight='bold', fontsize=9)
             
@@ -1062,28 +1093,30 @@ class AnalisadorRiscosLikert:
             # Remove o prefixo numérico do início, ex: "5.15 "
             titulo_grafico = re.sub(r'^\d+\.\d+\s*', '', titulo_grafico)
             
-            plt.title(titulo_grafico.strip(), fontsize=16, fontweight='bold', pad=20)
+            ax.set_title(titulo_grafico.strip(), fontsize=16, fontweight='bold', pad=20)
             # Configurar eixos X
-            plt.xticks(posicoes, [NIVEIS_RISCO[nivel] for nivel in range(1, 6)], 
-                      rotation=45, ha='right')
-            plt.xlim(0.5, 5.5)
-            plt.ylim(0, max([max(dados['percentuais'].values()) for dados in dados_grafico.values()]) + 10)
+            ax.set_xticks(posicoes)
+            ax.set_xticklabels([NIVEIS_RISCO[nivel] for nivel in range(1, 6)], 
+                               rotation=45, ha='right')
+            ax.set_xlim(0.5, 5.5)
+            ax.set_ylim(0, max([max(dados['percentuais'].values()) for dados in dados_grafico.values()]) + 10)
             
             # Grid e legendas
-            plt.grid(axis='y', alpha=0.3)
-            plt.legend(loc='upper right', framealpha=0.9)
+            ax.grid(axis='y', alpha=0.3)
+            ax.legend(loc='upper right', framealpha=0.9)
             
             # Adicionar informações estatísticas
             info_text = "Análise Temporal: Comparação da percepção de risco\n"
             info_text += "entre os três horizontes temporais"
-            plt.figtext(0.02, 0.02, info_text, fontsize=9, 
-                       style='italic', color='gray')
+            fig.text(0.02, 0.02, info_text, fontsize=9, 
+                     style='italic', color='gray')
             
-            plt.tight_layout()
+            fig.tight_layout()
             
             # Salvar gráfico
-            plt.savefig(caminho_salvar, dpi=300, bbox_inches='tight')
-            plt.close()
+            fig.savefig(caminho_salvar, dpi=300, bbox_inches='tight', pil_kwargs=PNG_PIL_KWARGS)
+            if figura_propria:
+                plt.close(fig)
             
             logger.info(f"Gráfico agrupado temporal salvo: {caminho_salvar}")
             return True
@@ -1168,7 +1201,7 @@ class AnalisadorRiscosLikert:
         except Exception as e:
             logger.error(f"Erro ao gerar relatório consolidado: {e}")
 
-def criar_grafico_agrupado_temporal(df, variavel, output_dir='outputs', nome_arquivo=None):
+def criar_grafico_agrupado_temporal(df, variavel, output_dir='outputs', nome_arquivo=None, ax=None):
     """
     Função simplificada para criar gráfico agrupado temporal (compatibilidade com script externo)
     
@@ -1177,6 +1210,7 @@ def criar_grafico_agrupado_temporal(df, variavel, output_dir='outputs', nome_arq
         variavel: Código da variável (ex: '4.1')
         output_dir: Diretório para salvar o gráfico
         nome_arquivo: Nome do arquivo (opcional)
+        ax: Eixo reaproveitado entre chamadas (opcional)
         
     Returns:
         True se sucesso, False se erro
@@ -1198,7 +1232,7 @@ def criar_grafico_agrupado_temporal(df, variavel, output_dir='outputs', nome_arq
             for periodo, variaveis in mapeamento['Social'].items():
                 for var in variaveis:
                     if var.startswith(variavel):
-                        dados_periodos[periodo] = df[var]
+                        dados_periodos[periodo] = df[var].to_numpy()
                         if nome_completo_variavel is None:
                             nome_completo_variavel = var
                         break
@@ -1219,7 +1253,7 @@ def criar_grafico_agrupado_temporal(df, variavel, output_dir='outputs', nome_arq
         
         # Gerar gráfico usando o método da classe
         sucesso = analisador.gerar_grafico_barras_agrupado_temporal(
-            dados_periodos, nome_completo_variavel, caminho_completo
+            dados_periodos, nome_completo_variavel, caminho_completo, ax=ax
         )
         
         return sucesso
@@ -1239,7 +1273,7 @@ def carregar_dados(excel_file='questionario.xlsx'):
         DataFrame com os dados ou None se erro
     """
     try:
-        return pd.read_excel(excel_file)
+        return ler_excel_com_cache(excel_file)
     except Exception as e:
         logger.error(f"Erro ao carregar dados: {e}")
         return None
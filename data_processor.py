@@ -10,6 +10,8 @@ import re
 from typing import Dict, List, Tuple, Any
 import logging
 
+from _cache_planilhas import ler_excel_com_cache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,6 +31,8 @@ class PortRiskDataProcessor:
         self.excel_file_path = excel_file_path
         self.raw_data = None
         self.processed_data = None
+        self.numeric_mask = None
+        self.risk_score_numeric = None
         self.risk_categories = {
             'Economic': list(range(1, 22)),  # 1.1 to 1.21
             'Environmental': list(range(22, 40)),  # 2.1 to 2.18
@@ -51,7 +55,7 @@ class PortRiskDataProcessor:
         """
         try:
             logger.info(f"Loading data from {self.excel_file_path}")
-            self.raw_data = pd.read_excel(self.excel_file_path)
+            self.raw_data = ler_excel_com_cache(self.excel_file_path)
             logger.info(f"Loaded {len(self.raw_data)} rows and {len(self.raw_data.columns)} columns")
             return self.raw_data
         except Exception as e:
@@ -162,6 +166,19 @@ class PortRiskDataProcessor:
         self.processed_data = pd.DataFrame(risk_records)
         logger.info(f"Processed {len(self.processed_data)} risk records")
         
+        # Cache the numeric score filter so downstream consumers reuse one scan
+        if self.processed_data.empty:
+            self.numeric_mask = pd.Series(dtype=bool)
+            self.risk_score_numeric = np.empty(0, dtype=np.float64)
+        else:
+            # Same rule as the dashboard filter: only int/float answers count
+            risk_scores = self.processed_data['risk_score']
+            if pd.api.types.is_numeric_dtype(risk_scores):
+                self.numeric_mask = pd.Series(True, index=risk_scores.index)
+            else:
+                self.numeric_mask = risk_scores.apply(lambda x: isinstance(x, (int, float)))
+            self.risk_score_numeric = risk_scores[self.numeric_mask].to_numpy(dtype=np.float64)
+        
         return self.processed_data
     
     def _extract_risk_description(self, column_name: str) -> str:
@@ -191,11 +208,12 @@ class PortRiskDataProcessor:
             self.process_risk_data()
         
         # Filter only numeric risk scores
-        numeric_data = self.processed_data[
-            self.processed_data['risk_score'].apply(lambda x: isinstance(x, (int, float)))
-        ].copy()
+        numeric_data = self.processed_data[self.numeric_mask].copy()
         
         stats = {
+            'mean_risk_score': numeric_data['risk_score'].mean(),
+            'std_risk_score': numeric_data['risk_score'].std(),
+            'n_risk_scores': len(self.risk_score_numeric),
             'overall_risk_levels': {
                 category: numeric_data[numeric_data['risk_category'] == category]['risk_score'].mean()
                 for category in self.risk_categories.keys()
@@ -248,9 +266,7 @@ class PortRiskDataProcessor:
         if self.processed_data is None:
             self.process_risk_data()
         
-        numeric_data = self.processed_data[
-            self.processed_data['risk_score'].apply(lambda x: isinstance(x, (int, float)))
-        ].copy()
+        numeric_data = self.processed_data[self.numeric_mask].copy()
         
         matrices = {}
         
@@ -38,44 +38,36 @@ def generate_insights_report():
     # Create outputs directory
     os.makedirs('outputs', exist_ok=True)
     
-    # Generate report sections
-    report_sections = []
-    
-    # 1. Executive Summary
-    exec_summary = generate_executive_summary(metadata, statistics)
-    report_sections.append(exec_summary)
-    
-    # 2. Risk Landscape Overview
-    risk_overview = generate_risk_overview(processed_data, statistics)
-    report_sections.append(risk_overview)
-    
-    # 3. Geographic Analysis
-    geo_analysis = generate_geographic_analysis(processed_data, statistics)
-    report_sections.append(geo_analysis)
-    
-    # 4. Port Type Comparison
-    port_comparison = generate_port_type_comparison(statistics)
-    report_sections.append(port_comparison)
-    
-    # 5. Time Period Analysis
-    time_analysis = generate_time_period_analysis(statistics)
-    report_sections.append(time_analysis)
-    
-    # 6. Top Risk Items
-    top_risks = generate_top_risks_analysis(statistics)
-    report_sections.append(top_risks)
-    
-    # 7. Key Recommendations
-    recommendations = generate_recommendations(statistics)
-    report_sections.append(recommendations)
-    
-    # Save complete report
-    complete_report = "\n\n".join(report_sections)
-    
-    # Save as text file
+    # Generate report sections, streaming each one to the text report
     report_path = 'outputs/port_risk_insights_report.txt'
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(complete_report)
+    with open(report_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        # 1. Executive Summary (kept for the console echo below)
+        exec_summary = generate_executive_summary(metadata, statistics)
+        f.write(exec_summary)
+        f.write("\n\n")
+        
+        # 2. Risk Landscape Overview
+        f.write(generate_risk_overview(statistics))
+        f.write("\n\n")
+        
+        # 3. Geographic Analysis
+        f.write(generate_geographic_analysis(processed_data, statistics))
+        f.write("\n\n")
+        
+        # 4. Port Type Comparison
+        f.write(generate_port_type_comparison(statistics))
+        f.write("\n\n")
+        
+        # 5. Time Period Analysis
+        f.write(generate_time_period_analysis(statistics))
+        f.write("\n\n")
+        
+        # 6. Top Risk Items
+        f.write(generate_top_risks_analysis(statistics))
+        f.write("\n\n")
+        
+        # 7. Key Recommendations
+        f.write(generate_recommendations(statistics))
     
     # Save as JSON for programmatic access
     json_path = 'outputs/port_risk_insights.json'
@@ -88,7 +80,7 @@ def generate_insights_report():
     }
     
     with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(insights_data, f, indent=2, ensure_ascii=False, default=str)
+        json.dump(to_json_ready(insights_data), f, ensure_ascii=False, separators=(',', ':'))
     
     print(f"\n✓ Reports generated successfully!")
     print(f"  - Text report: {report_path}")
@@ -138,7 +130,7 @@ Key Findings:
     
     return summary
 
-def generate_risk_overview(processed_data, statistics):
+def generate_risk_overview(statistics):
     """Generate risk landscape overview"""
     
     overview = """
@@ -149,24 +141,18 @@ Risk Category Analysis:
 """
     
     overall_risks = statistics.get('overall_risk_levels', {})
-    for category, score in overall_risks.items():
-        if score is not None:
-            risk_level = get_risk_level(score)
-            overview += f"- {category}: {score:.2f}/5.0 ({risk_level})\n"
-    
-    # Risk distribution
-    numeric_data = processed_data[
-        processed_data['risk_score'].apply(lambda x: isinstance(x, (int, float)))
-    ]
-    
-    if not numeric_data.empty:
-        mean_score = numeric_data['risk_score'].mean()
-        std_score = numeric_data['risk_score'].std()
+    scored = [(category, score) for category, score in overall_risks.items() if score is not None]
+    risk_levels = levels_of([score for _, score in scored])
+    for (category, score), risk_level in zip(scored, risk_levels):
+        overview += f"- {category}: {score:.2f}/5.0 ({risk_level})\n"
+    
+    # Risk distribution (aggregated once by the processor)
+    if statistics.get('n_risk_scores', 0):
         overview += f"""
 Overall Risk Statistics:
-- Mean Risk Score: {mean_score:.2f}/5.0
-- Standard Deviation: {std_score:.2f}
-- Total Risk Assessments: {len(numeric_data)}
+- Mean Risk Score: {statistics['mean_risk_score']:.2f}/5.0
+- Standard Deviation: {statistics['std_risk_score']:.2f}
+- Total Risk Assessments: {statistics['n_risk_scores']}
 """
     
     return overview
@@ -186,9 +172,11 @@ State-wise Risk Distribution:
         # Sort states by risk level
         sorted_states = sorted(state_risks.items(), key=lambda x: x[1] if x[1] is not None else 0, reverse=True)
         
-        for i, (state, score) in enumerate(sorted_states[:10], 1):
+        top_states = sorted_states[:10]
+        risk_levels = levels_of([score if score is not None else np.nan for _, score in top_states])
+        
+        for i, ((state, score), risk_level) in enumerate(zip(top_states, risk_levels), 1):
             if score is not None:
-                risk_level = get_risk_level(score)
                 geo_analysis += f"{i:2d}. {state}: {score:.2f}/5.0 ({risk_level})\n"
     
     return geo_analysis
@@ -226,15 +214,17 @@ Risk Evolution Over Time:
 """
     
     period_risks = statistics.get('risk_by_time_period', {})
-    for period, categories in period_risks.items():
-        if period and categories:
-            avg_score = np.mean([score for score in categories.values() if score is not None])
-            risk_level = get_risk_level(avg_score)
-            time_analysis += f"\n{period} (Average: {avg_score:.2f}/5.0 - {risk_level}):\n"
-            
-            for category, score in categories.items():
-                if score is not None:
-                    time_analysis += f"  - {category}: {score:.2f}\n"
+    periods = [(period, categories) for period, categories in period_risks.items() if period and categories]
+    avg_scores = [np.mean([score for score in categories.values() if score is not None])
+                  for _, categories in periods]
+    risk_levels = levels_of(avg_scores)
+    
+    for (period, categories), avg_score, risk_level in zip(periods, avg_scores, risk_levels):
+        time_analysis += f"\n{period} (Average: {avg_score:.2f}/5.0 - {risk_level}):\n"
+        
+        for category, score in categories.items():
+            if score is not None:
+                time_analysis += f"  - {category}: {score:.2f}\n"
     
     return time_analysis
 
@@ -252,9 +242,10 @@ Highest Risk Items by Category:
     for category, risks in top_risks.items():
         if risks:
             top_risks_section += f"\n{category}:\n"
-            for i, (risk_desc, score) in enumerate(list(risks.items())[:5], 1):
+            top_items = list(risks.items())[:5]
+            risk_levels = levels_of([score if score is not None else np.nan for _, score in top_items])
+            for i, ((risk_desc, score), risk_level) in enumerate(zip(top_items, risk_levels), 1):
                 if score is not None:
-                    risk_level = get_risk_level(score)
                     top_risks_section += f"{i}. {risk_desc}: {score:.2f}/5.0 ({risk_level})\n"
     
     return top_risks_section
@@ -307,6 +298,32 @@ Based on the risk assessment analysis, the following key recommendations are pro
     
     return recommendations
 
+def to_json_ready(obj):
+    """Convert datetimes and NumPy scalars to native JSON types in one walk"""
+    if isinstance(obj, dict):
+        return {to_json_ready(key) if isinstance(key, (datetime, np.generic)) else key: to_json_ready(value)
+                for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_json_ready(value) for value in obj]
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, np.datetime64):
+        return pd.Timestamp(obj).isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+# Risk level labels indexed by np.digitize over the [1, 2, 3, 4] thresholds
+_LEVELS = np.array(['Very Low', 'Low', 'Medium', 'High', 'Critical'])
+_LEVEL_THRESHOLDS = [1.0, 2.0, 3.0, 4.0]
+
+def levels_of(scores):
+    """Determine risk levels for a sequence of scores in one vectorized pass"""
+    scores = np.asarray(scores, dtype=np.float64)
+    # NaN scores fall in the lowest bucket, matching get_risk_level
+    indices = np.where(np.isnan(scores), 0, np.digitize(scores, _LEVEL_THRESHOLDS))
+    return _LEVELS[indices]
+
 def get_risk_level(score):
     """Determine risk level based on score"""
     if score >= 4.0:
@@ -9,6 +9,7 @@ import os
 import re
 import pandas as pd
 import numpy as np
+from collections import defaultdict
 from typing import Dict, List, Tuple, Any
 
 # Adicionar path atual
@@ -183,35 +184,23 @@ class GeradorCalloutsFrequencias:
             print(f"Dimensão {dimensao} não encontrada no mapeamento")
             return callouts
         
-        # Coletar variáveis únicas da dimensão
-        variaveis_unicas = set()
+        # Indexar variáveis por número base (ex: "1.1") e período em uma única passada
+        indice_variaveis = defaultdict(dict)
         for periodo, variaveis in self.mapeamento[dimensao].items():
-            variaveis_unicas.update(variaveis)
-        
-        # Agrupar variáveis por número base (ex: "1.1", "1.2", etc.)
-        variaveis_por_numero = {}
-        for variavel in variaveis_unicas:
-            numero_base = self.extrair_numero_variavel(variavel)
-            if numero_base not in variaveis_por_numero:
-                variaveis_por_numero[numero_base] = []
-            variaveis_por_numero[numero_base].append(variavel)
+            for var in variaveis:
+                numero_base = self.extrair_numero_variavel(var)
+                indice_variaveis[numero_base].setdefault(periodo, var)
         
         # Ordenar números base
-        numeros_ordenados = sorted(variaveis_por_numero.keys(), key=lambda x: float(x))
+        numeros_ordenados = sorted(indice_variaveis.keys(), key=lambda x: float(x))
         
         for numero_base in numeros_ordenados:
+            variaveis_periodo = indice_variaveis[numero_base]
             # Usar a primeira variável como referência para o nome
-            variaveis_grupo = variaveis_por_numero[numero_base]
-            variavel_referencia = variaveis_grupo[0]
+            variavel_referencia = next(iter(variaveis_periodo.values()))
             
             # Extrair dados por período
-            dados_periodos = {}
-            
-            for periodo, variaveis in self.mapeamento[dimensao].items():
-                for var in variaveis:
-                    if var.startswith(numero_base):
-                        dados_periodos[periodo] = self.df[var]
-                        break
+            dados_periodos = {periodo: self.df[var] for periodo, var in variaveis_periodo.items()}
             
             if dados_periodos:
                 callout = self.gerar_descricao_frequencias(variavel_referencia, dados_periodos)
@@ -312,22 +301,28 @@ class GeradorCalloutsFrequencias:
         print("Iniciando geração de callouts de frequências temporais...")
         print(f"Dimensões a processar: {self.dimensoes_processar}")
         
+        # Determinar caminho do arquivo Quarto com nomes corretos
+        mapeamento_arquivos = {
+            'Economica': 'economic.qmd',
+            'Ambiental': 'ambiental.qmd',
+            'Geopolitica': 'geopolitico.qmd',
+            'Tecnologica': 'tecnologico.qmd'
+        }
+        
         for dimensao in self.dimensoes_processar:
             print(f"\nProcessando dimensão: {dimensao}")
             
+            arquivo_quarto = f"quarto/{mapeamento_arquivos.get(dimensao, dimensao.lower())}"
+            
+            # Evitar a análise completa quando não há arquivo para atualizar
+            if not os.path.exists(arquivo_quarto):
+                print(f"⚠️ Arquivo {arquivo_quarto} não encontrado. Dimensão {dimensao} ignorada")
+                continue
+            
             # Gerar callouts
             callouts = self.gerar_callouts_para_dimensao(dimensao)
             
             if callouts:
-                # Determinar caminho do arquivo Quarto com nomes corretos
-                mapeamento_arquivos = {
-                    'Economica': 'economic.qmd',
-                    'Ambiental': 'ambiental.qmd',
-                    'Geopolitica': 'geopolitico.qmd',
-                    'Tecnologica': 'tecnologico.qmd'
-                }
-                arquivo_quarto = f"quarto/{mapeamento_arquivos.get(dimensao, dimensao.lower())}"
-                
                 # Atualizar arquivo
                 self.atualizar_arquivo_quarto(arquivo_quarto, callouts, dimensao)
                 
@@ -6,15 +6,23 @@ para o periodo Imediato 2025 em cada dimensao analisada.
 
 from __future__ import annotations
 
+import io
 import sys
 import unicodedata
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Iterable, List
 
+import matplotlib
+
+matplotlib.use("Agg")  # geracao apenas de arquivos PNG, sem interface grafica
+
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 
 from analise_likert_riscos import AnalisadorRiscosLikert
+from _cache_dados import obter_analisador, obter_mapeamento
 
 # Configuracao por dimensao
 DIMENSIONS: Dict[str, Dict[str, object]] = {
@@ -77,9 +85,19 @@ DIMENSIONS: Dict[str, Dict[str, object]] = {
 
 PERIODO_TARGET = "imediato_2025"
 
+# Buscas de dimensao por slug ou pelo nome da chave (minusculo), montadas uma vez
+_SLUG_MAP: Dict[str, str] = {cfg["slug"]: chave for chave, cfg in DIMENSIONS.items()}
+_NAME_LOWER_MAP: Dict[str, str] = {chave.lower(): chave for chave in DIMENSIONS}
+
+# tight_layout e chamado explicitamente; evita uma segunda passada de layout
+plt.rcParams["figure.autolayout"] = False
 
+
+@lru_cache(maxsize=None)
 def ascii_safe(texto: str) -> str:
     """Remove acentuacao para evitar erros em consoles Windows."""
+    if texto.isascii():
+        return texto
     return "".join(
         caractere
         for caractere in unicodedata.normalize("NFKD", texto)
@@ -93,34 +111,37 @@ def selecionar_dimensoes(argumentos: Iterable[str]) -> List[str]:
         return list(DIMENSIONS.keys())
 
     selecionadas: List[str] = []
-    slug_map = {cfg["slug"]: chave for chave, cfg in DIMENSIONS.items()}
+    vistas = set()
 
     for argumento in argumentos:
         chave = argumento.strip().lower()
         if chave in ("all", "todas"):
             return list(DIMENSIONS.keys())
 
-        if chave in slug_map:
-            selecionadas.append(slug_map[chave])
-        else:
-            # tentativa direta com o nome da chave
-            for nome_dimensao in DIMENSIONS:
-                if nome_dimensao.lower() == chave:
-                    selecionadas.append(nome_dimensao)
-                    break
-            else:
-                print(f"Aviso: dimensao desconhecida ignorada -> {argumento}")
+        # slug ou, em seguida, o nome direto da chave
+        nome_dimensao = _SLUG_MAP.get(chave) or _NAME_LOWER_MAP.get(chave)
+        if not nome_dimensao:
+            print(f"Aviso: dimensao desconhecida ignorada -> {argumento}")
+        elif nome_dimensao not in vistas:
+            # ignora duplicados ja na insercao, preservando a ordem
+            vistas.add(nome_dimensao)
+            selecionadas.append(nome_dimensao)
 
-    # remove duplicados preservando ordem
-    return list(dict.fromkeys(selecionadas))
+    return selecionadas
 
 
 def gerar_grafico_barras_imediato(
     analisador: AnalisadorRiscosLikert,
     mapeamento: Dict[str, Dict[str, List[str]]],
     dimensao: str,
+    ax: plt.Axes | None = None,
 ) -> Path | None:
-    """Cria o grafico horizontal para a dimensao informada."""
+    """
+    Cria o grafico horizontal para a dimensao informada.
+
+    Quando ``ax`` e informado, a figura correspondente e reaproveitada (limpa e
+    redimensionada) em vez de criar e descartar uma figura nova a cada chamada.
+    """
     config = DIMENSIONS[dimensao]
     friendly = config["friendly"]
     ylabel = config["ylabel"]
@@ -138,19 +159,23 @@ def gerar_grafico_barras_imediato(
 
     percentuais_risco_alto: Dict[str, float] = {}
 
-    for variavel in variaveis_periodo:
-        if variavel not in analisador.dados_brutos:
-            continue
+    colunas = [variavel for variavel in variaveis_periodo if variavel in analisador.dados_brutos]
+    if colunas:
+        # Percentual de respostas 4-5 de todas as variaveis em uma unica reducao
+        respostas = analisador.dados_brutos[colunas].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        total_validas = (~np.isnan(respostas)).sum(axis=0)
+        total_alto = np.isin(respostas, (4, 5)).sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentuais = total_alto / total_validas * 100
 
-        serie = analisador.dados_brutos[variavel]
-        estatisticas = analisador.analisar_frequencias_likert(serie)
-        if not estatisticas:
-            continue
+        for variavel, validas, percentual in zip(colunas, total_validas, percentuais):
+            if validas == 0:
+                continue
 
-        label_completo = analisador.gerar_label_sucinto(variavel, incluir_numero=False)
-        label_ascii = ascii_safe(label_completo)
-        label_abreviado = abreviacoes.get(label_ascii, label_ascii)
-        percentuais_risco_alto[label_abreviado] = estatisticas["percentual_risco_alto"]
+            label_completo = analisador.gerar_label_sucinto(variavel, incluir_numero=False)
+            label_ascii = ascii_safe(label_completo)
+            label_abreviado = abreviacoes.get(label_ascii, label_ascii)
+            percentuais_risco_alto[label_abreviado] = float(percentual)
 
     if not percentuais_risco_alto:
         print("  Nenhuma variavel valida encontrada. Grafico nao gerado.")
@@ -162,7 +187,17 @@ def gerar_grafico_barras_imediato(
     valores = np.array([item[1] for item in ordenados_desc][::-1])
 
     altura = max(6.0, 0.45 * len(labels))
-    plt.figure(figsize=(14, altura))
+    figura_propria = ax is None
+    if figura_propria:
+        fig, ax = plt.subplots(figsize=(14, altura))
+    else:
+        fig = ax.figure
+        ax.clear()
+        fig.set_size_inches(14, altura)
+        # descarta as margens calculadas pelo tight_layout da dimensao anterior
+        fig.subplots_adjust(
+            **{lado: plt.rcParams[f"figure.subplot.{lado}"] for lado in ("left", "bottom", "right", "top")}
+        )
 
     # Gera paleta baseada na intensidade
     amplitude = float(np.ptp(valores))
@@ -171,26 +206,29 @@ def gerar_grafico_barras_imediato(
     else:
         norm = (valores - valores.min()) / amplitude
         cmap = plt.colormaps["OrRd"]
-        cores = [cmap(0.35 + 0.5 * valor) for valor in norm]
+        cores = cmap(0.35 + 0.5 * norm)
 
-    barras = plt.barh(range(len(labels)), valores, color=cores, edgecolor="black", linewidth=0.5)
+    barras = ax.barh(range(len(labels)), valores, color=cores, edgecolor="black", linewidth=0.5)
+    # barras rasterizadas: nenhum efeito no PNG, mas evita patches vetoriais em PDF/SVG
+    for barra in barras:
+        barra.set_rasterized(True)
 
-    plt.xlabel("Percentual de respostas em niveis altos (4-5)", fontsize=12, fontweight="bold")
-    plt.ylabel(ylabel, fontsize=12, fontweight="bold")
-    plt.title(
+    ax.set_xlabel("Percentual de respostas em niveis altos (4-5)", fontsize=12, fontweight="bold")
+    ax.set_ylabel(ylabel, fontsize=12, fontweight="bold")
+    ax.set_title(
         f"{friendly} - Imediato 2025\nPercentual de respostas em niveis altos (4-5)",
         fontsize=14,
         fontweight="bold",
         pad=20,
     )
 
-    plt.yticks(range(len(labels)), labels, fontsize=10)
-    plt.xlim(0, max(valores) * 1.1)
-    plt.xticks(fontsize=10)
-    plt.grid(axis="x", alpha=0.3, linestyle="--")
+    ax.set_yticks(range(len(labels)), labels, fontsize=10)
+    ax.set_xlim(0, max(valores) * 1.1)
+    ax.tick_params(axis="x", labelsize=10)
+    ax.grid(axis="x", alpha=0.3, linestyle="--")
 
     for barra, valor in zip(barras, valores):
-        plt.text(
+        ax.text(
             barra.get_width() + 0.5,
             barra.get_y() + barra.get_height() / 2,
             f"{valor:.1f}%",
@@ -200,17 +238,21 @@ def gerar_grafico_barras_imediato(
             fontweight="bold",
         )
 
-    plt.tight_layout()
+    fig.tight_layout()
 
-    destino_principal = arquivos_saida[0]
-    destino_principal.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(destino_principal, dpi=300, bbox_inches="tight", facecolor="white")
-    plt.close()
+    # Codifica o PNG uma unica vez e grava os mesmos bytes em todos os destinos
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=300, bbox_inches="tight", facecolor="white")
+    if figura_propria:
+        plt.close(fig)
+    conteudo_png = buffer.getvalue()
 
-    # Copia para caminhos adicionais (quando existirem)
-    for destino_extra in arquivos_saida[1:]:
-        destino_extra.parent.mkdir(parents=True, exist_ok=True)
-        destino_extra.write_bytes(destino_principal.read_bytes())
+    destino_principal = arquivos_saida[0]
+    for destino in arquivos_saida:
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        # remove antes de gravar para nao escrever atraves de hardlinks antigos
+        destino.unlink(missing_ok=True)
+        destino.write_bytes(conteudo_png)
 
     print(
         f"  Grafico salvo em: {destino_principal} "
@@ -227,14 +269,21 @@ def gerar_grafico_barras_imediato(
     return destino_principal
 
 
-def gerar_grafico_barras_imediato_2025() -> Path | None:
+def gerar_grafico_barras_imediato_2025(
+    analisador: AnalisadorRiscosLikert | None = None,
+    mapeamento: Dict[str, Dict[str, List[str]]] | None = None,
+) -> Path | None:
     """
     Funcao mantida por compatibilidade com scripts antigos.
     Continua gerando o grafico para a dimensao Social.
     """
-    analisador = AnalisadorRiscosLikert()
-    analisador.carregar_dados()
-    mapeamento = analisador.mapear_variaveis_por_dimensao()
+    if analisador is None:
+        # Questionario compartilhado do processo (ver _cache_dados)
+        analisador = obter_analisador()
+        if mapeamento is None:
+            mapeamento = obter_mapeamento()
+    elif mapeamento is None:
+        mapeamento = analisador.mapear_variaveis_por_dimensao()
     return gerar_grafico_barras_imediato(analisador, mapeamento, "Social")
 
 
@@ -244,12 +293,15 @@ def main() -> None:
         print("Nenhuma dimensao valida informada. Encerrando.")
         return
 
-    analisador = AnalisadorRiscosLikert()
-    analisador.carregar_dados()
-    mapeamento = analisador.mapear_variaveis_por_dimensao()
+    analisador, mapeamento = obter_analisador(), obter_mapeamento()
 
-    for dimensao in dimensoes:
-        gerar_grafico_barras_imediato(analisador, mapeamento, dimensao)
+    # Uma unica figura reaproveitada por todas as dimensoes
+    fig, ax = plt.subplots(figsize=(14, 10))
+    try:
+        for dimensao in dimensoes:
+            gerar_grafico_barras_imediato(analisador, mapeamento, dimensao, ax=ax)
+    finally:
+        plt.close(fig)
 
 
 if __name__ == "__main__":
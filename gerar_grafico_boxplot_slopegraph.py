@@ -8,8 +8,13 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # somente gera PNGs; evita inicializar backends interativos
 import matplotlib.pyplot as plt
 from matplotlib import cm
+from matplotlib.collections import LineCollection
+
+from _cache_planilhas import ler_excel_com_cache
 
 # --- CONFIG ---
 INPUT_XLSX = "questionario.xlsx"
@@ -18,6 +23,9 @@ LABEL_WIDTH = 70
 MIN_GAP = 0.035  # igual ao script de referência
 FILTRO_CURTO_MIN =-np.inf  #3.0  # igual ao script de referência
 
+# tight_layout é chamado explicitamente; evita uma segunda passada de layout
+plt.rcParams["figure.autolayout"] = False
+
 # Mapeamento das dimensões baseado nos prefixos das variáveis
 DIMENSOES = {
     "Economica": {
@@ -47,23 +55,38 @@ DIMENSOES = {
     }
 }
 
+# Dígito inicial da variável -> dimensão (derivado dos prefixos acima)
+DIGIT_TO_DIM = {
+    prefixo.rstrip("."): dimensao
+    for dimensao, config in DIMENSOES.items()
+    for prefixo in config["prefixos"]
+}
+
+# Regexes de limpeza compiladas uma única vez
+_RE_BRACKET = re.compile(r'\s*\[.*?\]\s*')
+_RE_NUMDASH = re.compile(r'^\s*\d+(?:\.\d+)*\s*-\s*')
+_RE_NUM = re.compile(r'^\s*\d+(?:\.\d+)*\s*')
+_RE_WS = re.compile(r'\s+')
+
 # --- utilitárias ---
 
 def clean_base(colname: str) -> str:
-    base = re.sub(r'\s*\[.*?\]\s*', '', colname)
-    base = re.sub(r'^\s*\d+(?:\.\d+)*\s*-\s*', '', base)
-    base = re.sub(r'^\s*\d+(?:\.\d+)*\s*', '', base)
-    return re.sub(r'\s+', ' ', base).strip()
+    base = _RE_BRACKET.sub('', colname)
+    base = _RE_NUMDASH.sub('', base)
+    base = _RE_NUM.sub('', base)
+    return _RE_WS.sub(' ', base).strip()
 
 def short_label(s: str, width=70) -> str:
+    if len(s) <= width:
+        return s
     return shorten(s, width=width, placeholder="…")
 
-def identificar_dimensao(variavel_colname: str) -> str:
-    for dimensao, config in DIMENSOES.items():
-        for prefixo in config["prefixos"]:
-            if variavel_colname.startswith(prefixo):
-                return dimensao
-    return "Outra"
+def identificar_dimensoes(colunas) -> pd.Series:
+    """Classifica todas as colunas de uma vez pelo dígito inicial (ex.: '1.' -> Economica)."""
+    return (pd.Series(list(colunas), index=list(colunas), dtype=object)
+            .str.extract(r'^(\d)\.', expand=False)
+            .map(DIGIT_TO_DIM)
+            .fillna("Outra"))
 
 # --- plot de UMA dimensão com o mesmo visual do seu exemplo ---
 
@@ -76,35 +99,43 @@ def plot_dimensao(subset: pd.DataFrame, nome_dimensao: str, cor_dimensao: str) -
     subset["y_mid"] = (subset["curto_mean"] + subset["longo_mean"]) / 2
     subset = subset.sort_values("y_mid").reset_index(drop=True)
 
-    # evita colisões (mesmo critério do script de referência)
-    for i in range(1, len(subset)):
-        if subset.loc[i, "y_mid"] - subset.loc[i-1, "y_mid"] < MIN_GAP:
-            subset.loc[i, "y_mid"] = subset.loc[i-1, "y_mid"] + MIN_GAP
+    # evita colisões (mesmo critério do script de referência): cada rótulo fica
+    # no mínimo MIN_GAP acima do anterior, via máximo acumulado
+    y = subset["y_mid"].to_numpy()
+    offsets = np.arange(len(y)) * MIN_GAP
+    subset["y_mid"] = np.maximum.accumulate(y - offsets) + offsets
 
     # --- VISUAL: idêntico ao script que você aprovou ---
     fig, ax = plt.subplots(figsize=(12, max(10, 0.35 * len(subset))))
     x_left, x_center, x_right = 0.0, 0.5, 1.0
 
     cmap = cm.get_cmap('Dark2', max(8, len(subset)))
-
-    for i, (_, r) in enumerate(subset.iterrows()):
-        color = cmap(i % cmap.N)
-        y0, y1, ym = r["curto_mean"], r["longo_mean"], r["y_mid"]
-
-        # pontos
-        ax.plot([x_left],  [y0], marker='o', color=color)
-        ax.plot([x_right], [y1], marker='o', color=color)
-
-        # conectores para o rótulo central
-        ax.plot([x_left,  x_center - 0.015], [y0, ym], linewidth=1.6, color=color)
-        ax.plot([x_right, x_center + 0.015], [y1, ym], linewidth=1.6, color=color)
-
+    colors = cmap(np.arange(len(subset)) % cmap.N)
+
+    y0 = subset["curto_mean"].to_numpy()
+    y1 = subset["longo_mean"].to_numpy()
+    ym = subset["y_mid"].to_numpy()
+
+    # pontos: um único artista por lado
+    ax.scatter(np.full_like(y0, x_left), y0, color=colors, zorder=2)
+    ax.scatter(np.full_like(y1, x_right), y1, color=colors, zorder=2)
+
+    # conectores para o rótulo central: um único LineCollection por lado
+    segs_left = np.stack([np.column_stack([np.full_like(y0, x_left), y0]),
+                          np.column_stack([np.full_like(ym, x_center - 0.015), ym])], axis=1)
+    segs_right = np.stack([np.column_stack([np.full_like(y1, x_right), y1]),
+                           np.column_stack([np.full_like(ym, x_center + 0.015), ym])], axis=1)
+    ax.add_collection(LineCollection(segs_left, colors=colors, linewidths=1.6, zorder=2))
+    ax.add_collection(LineCollection(segs_right, colors=colors, linewidths=1.6, zorder=2))
+    ax.autoscale_view()
+
+    for color, v0, v1, vm, label in zip(colors, y0, y1, ym, subset["label"]):
         # valores numéricos ao lado dos pontos
-        ax.text(x_left - 0.02,  y0, f"{y0:.2f}", ha='right', va='center', fontsize=8, color=color)
-        ax.text(x_right + 0.02, y1, f"{y1:.2f}", ha='left',  va='center', fontsize=8, color=color)
+        ax.text(x_left - 0.02,  v0, f"{v0:.2f}", ha='right', va='center', fontsize=8, color=color)
+        ax.text(x_right + 0.02, v1, f"{v1:.2f}", ha='left',  va='center', fontsize=8, color=color)
 
         # rótulo central
-        ax.text(x_center, ym, r["label"], ha='center', va='center', fontsize=8, color=color,
+        ax.text(x_center, vm, label, ha='center', va='center', fontsize=8, color=color,
                 bbox=dict(boxstyle='round,pad=0.18', fc='white', ec=color, alpha=0.7, lw=0.6))
 
     # Eixos/grade/limites iguais ao exemplo
@@ -132,8 +163,8 @@ def plot_dimensao(subset: pd.DataFrame, nome_dimensao: str, cor_dimensao: str) -
 def main():
     print("=== GERANDO SLOPEGRAPHS POR DIMENSÃO (visual igual ao exemplo) ===")
 
-    xls = pd.ExcelFile(INPUT_XLSX)
-    df = pd.read_excel(INPUT_XLSX, sheet_name=xls.sheet_names[0])
+    # apenas a primeira planilha é usada (via cópia em pickle quando atualizada)
+    df = ler_excel_com_cache(INPUT_XLSX)
 
     # normaliza placeholders
     df = df.replace({'-': np.nan, '–': np.nan})
@@ -146,16 +177,31 @@ def main():
     curto_map = {c: clean_base(c) for c in curto_cols}
     longo_map = {c: clean_base(c) for c in longo_cols}
 
-    common_vars = sorted(set(curto_map.values()).intersection(longo_map.values()))
+    # mapas inversos base -> coluna (a primeira coluna de cada base prevalece)
+    curto_inv = {}
+    for col, base in curto_map.items():
+        curto_inv.setdefault(base, col)
+    longo_inv = {}
+    for col, base in longo_map.items():
+        longo_inv.setdefault(base, col)
+
+    common_vars = sorted(set(curto_inv).intersection(longo_inv))
+
+    # médias de todas as colunas (curto e longo prazo) em uma única conversão
+    df_num = df[curto_cols + longo_cols].apply(pd.to_numeric, errors='coerce')
+    means = df_num.mean()
+
+    # dimensão de cada coluna de curto prazo, classificada em lote
+    curto_dims = identificar_dimensoes(curto_cols)
 
     # calcular médias e dimensão
     rows = []
     for var in common_vars:
-        curto_col = next(k for k, v in curto_map.items() if v == var)
-        longo_col = next(k for k, v in longo_map.items() if v == var)
-        curto_mean = pd.to_numeric(df[curto_col], errors='coerce').mean()
-        longo_mean = pd.to_numeric(df[longo_col], errors='coerce').mean()
-        dimensao = identificar_dimensao(curto_col)
+        curto_col = curto_inv[var]
+        longo_col = longo_inv[var]
+        curto_mean = means[curto_col]
+        longo_mean = means[longo_col]
+        dimensao = curto_dims[curto_col]
         rows.append({
             "variavel": var,
             "curto_mean": curto_mean,
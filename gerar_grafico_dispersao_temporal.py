@@ -6,17 +6,32 @@ e longo prazo (eixo y) utilizando filtros estatisticos robustos.
 
 from __future__ import annotations
 
+import heapq
+import io
+import pickle
+import re
 import sys
 import unicodedata
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+import matplotlib
+
+matplotlib.use("Agg")  # geracao apenas de arquivos PNG, sem interface grafica
+
+import matplotlib.colors as mcolors
 import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
 import numpy as np
 import pandas as pd
-import seaborn as sns
 
+import analise_likert_riscos
 from analise_likert_riscos import AnalisadorRiscosLikert
+from _cache_planilhas import DIRETORIO_CACHE, salvar_pickle_atomico
+
+# Estilo padrao do matplotlib (visual dos graficos publicados), aplicado uma unica vez
+plt.style.use('default')
 
 # Configuracao de cores por dimensao
 CORES_DIMENSAO = {
@@ -27,6 +42,13 @@ CORES_DIMENSAO = {
     "Tecnologica": "#DC143C",    # Vermelho
 }
 
+# Indice inteiro de cada dimensao e cores RGBA correspondentes, para indexacao vetorial
+_DIMS = list(CORES_DIMENSAO)
+_COLOR_ARR = np.array([mcolors.to_rgba(CORES_DIMENSAO[d]) for d in _DIMS])
+
+# Cache dos pares de variaveis entre execucoes (invalidado pela data da planilha e do codigo)
+CACHE_PARES = DIRETORIO_CACHE / "pares_variaveis.pkl"
+
 # Configuracao de nomes amigaveis
 NOMES_DIMENSAO = {
     "Economica": "Econômica",
@@ -36,26 +58,28 @@ NOMES_DIMENSAO = {
     "Tecnologica": "Tecnológica",
 }
 
+# Padrão "numero descricao [periodo]" e palavras-chave preservadas nos rótulos
+_LABEL_RE = re.compile(r'^(\d+\.\d+)\s*(.+?)\s*\[.*?\]$')
+_KEYWORDS = frozenset({'crise', 'risco', 'impacto', 'disrupção', 'contaminação'})
+
 def ascii_safe(texto: str) -> str:
     """Remove acentuacao para evitar erros em consoles Windows."""
-    return "".join(
-        caractere
-        for caractere in unicodedata.normalize("NFKD", texto)
-        if not unicodedata.combining(caractere)
-    )
+    # NFKD separa as marcas de acento, que o encode ASCII descarta em C
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
 
 def extrair_numero_variavel(nome_variavel: str) -> str:
     """Extrai o numero da variavel (ex: '1.1' de '1.1 Risco X')"""
-    partes = nome_variavel.split('.')
-    if len(partes) >= 2:
-        return f"{partes[0]}.{partes[1].split()[0]}"
-    return nome_variavel
+    prefixo, separador, resto = nome_variavel.partition('.')
+    if not separador:
+        return nome_variavel
+    # primeiro termo entre o primeiro e o segundo ponto
+    sufixo = resto.partition('.')[0].lstrip().partition(' ')[0]
+    return f"{prefixo}.{sufixo}"
 
 def gerar_label_sucinto_dispersao(nome_variavel: str) -> str:
     """Gera rotulo sucinto para o grafico de dispersao."""
     # Extrair número e descrição
-    import re
-    match = re.match(r'^(\d+\.\d+)\s*(.+?)\s*\[.*?\]$', nome_variavel)
+    match = _LABEL_RE.match(nome_variavel)
     if match:
         numero = match.group(1)
         descricao_completa = match.group(2).strip()
@@ -70,7 +94,7 @@ def gerar_label_sucinto_dispersao(nome_variavel: str) -> str:
             for palavra in palavras:
                 if len(' '.join(palavras_chave + [palavra])) <= 45:
                     palavras_chave.append(palavra)
-                elif palavra.lower() in ['crise', 'risco', 'impacto', 'disrupção', 'contaminação']:
+                elif palavra.lower() in _KEYWORDS:
                     palavras_chave.append(palavra)
                 elif len(palavra) > 8:  # Palavras longas podem ser importantes
                     palavras_chave.append(palavra)
@@ -83,57 +107,99 @@ def gerar_label_sucinto_dispersao(nome_variavel: str) -> str:
     
     return nome_variavel
 
-def aplicar_filtros_estatisticos(dados_pares: List[Dict]) -> List[Dict]:
+def calcular_mediana_iqr(dados: pd.DataFrame, colunas: List[str]) -> Dict[str, dict]:
+    """
+    Calcula mediana e amplitude interquartil de várias colunas Likert de uma vez.
+    
+    Args:
+        dados: DataFrame com as respostas brutas
+        colunas: Colunas a analisar
+        
+    Returns:
+        Dicionário coluna -> {'mediana', 'iqr'}; colunas sem respostas numéricas
+        mapeiam para um dicionário vazio, como em analisar_frequencias_likert
+    """
+    if not colunas:
+        return {}
+    
+    bloco = dados[colunas].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    validas = ~np.isnan(bloco).all(axis=0)
+    
+    # Quartis de todas as colunas válidas em uma única chamada (interpolação linear, como no pandas)
+    q25, mediana, q75 = np.nanpercentile(bloco[:, validas], [25, 50, 75], axis=0)
+    
+    stats = {coluna: {} for coluna in colunas}
+    colunas_validas = [coluna for coluna, valida in zip(colunas, validas) if valida]
+    for coluna, med, iqr in zip(colunas_validas, mediana, q75 - q25):
+        stats[coluna] = {'mediana': med, 'iqr': iqr}
+    return stats
+
+def aplicar_filtros_estatisticos(dados_pares: List[Dict]) -> Dict[str, object]:
     """
     Prepara dados para análise sem filtros restritivos para maximizar visualização.
     
+    As métricas são extraídas uma única vez para arrays paralelos, de modo que
+    o gráfico e a análise estatística operem diretamente sobre vetores NumPy.
+    
     Args:
         dados_pares: Lista com pares de dados (curto e longo prazo)
         
     Returns:
-        Lista com todas as variáveis para análise completa
+        Dicionário com os arrays 'xs' (mediana curto prazo), 'ys' (mediana
+        longo prazo), 'delta', 'var' (variabilidade média), 'mediana_comb' e
+        'dims'/'dim_idx' (dimensão de cada par, por nome e índice em _DIMS),
+        alinhados com a lista original 'pars'
     """
     print(f"\nPreparando dados para análise completa...")
     print(f"Total de pares encontrados: {len(dados_pares)}")
     
-    dados_preparados = []
+    n = len(dados_pares)
+    xs = np.empty(n)
+    ys = np.empty(n)
+    iqr_curto = np.empty(n)
+    iqr_longo = np.empty(n)
     
-    for par in dados_pares:
+    for i, par in enumerate(dados_pares):
         stats_curto = par['stats_curto']
         stats_longo = par['stats_longo']
-        
-        # Calcular métricas para análise
-        mediana_combinada = (stats_curto['mediana'] + stats_longo['mediana']) / 2
-        delta_temporal = abs(stats_longo['mediana'] - stats_curto['mediana'])
-        variabilidade_media = (stats_curto['iqr'] + stats_longo['iqr']) / 2
-        
-        # Adicionar informações adicionais para análise
-        par['mediana_combinada'] = mediana_combinada
-        par['delta_temporal'] = delta_temporal
-        par['variabilidade_media'] = variabilidade_media
-        
-        dados_preparados.append(par)
-    
-    print(f"Todos os {len(dados_preparados)} pares incluídos na análise")
+        xs[i] = stats_curto['mediana']
+        ys[i] = stats_longo['mediana']
+        iqr_curto[i] = stats_curto['iqr']
+        iqr_longo[i] = stats_longo['iqr']
+    
+    # Calcular métricas para análise
+    dados_preparados = {
+        'xs': xs,
+        'ys': ys,
+        'delta': np.abs(ys - xs),
+        'var': (iqr_curto + iqr_longo) / 2,
+        'mediana_comb': (xs + ys) / 2,
+        'dims': np.array([par['dimensao'] for par in dados_pares], dtype=object),
+        'dim_idx': np.fromiter((_DIMS.index(par['dimensao']) for par in dados_pares),
+                               dtype=np.int8, count=n),
+        'pars': dados_pares,
+    }
+    
+    print(f"Todos os {n} pares incluídos na análise")
     
     return dados_preparados
 
-def gerar_grafico_dispersao_temporal() -> Path:
+def coletar_pares_variaveis(analisador: AnalisadorRiscosLikert) -> List[Dict]:
     """
-    Gera grafico de dispersao comparando curto prazo vs longo prazo.
+    Coleta os pares de variáveis (curto e longo prazo) com mediana e IQR.
     
+    Args:
+        analisador: Analisador ainda sem dados carregados
+        
     Returns:
-        Path do arquivo gerado
+        Lista de pares com estatísticas, rótulo e cor da dimensão
     """
-    print("Gerando gráfico de dispersão temporal...")
-    
-    # Inicializar analisador
-    analisador = AnalisadorRiscosLikert()
+    # Carregar dados
     analisador.carregar_dados()
     mapeamento = analisador.mapear_variaveis_por_dimensao()
     
-    # Coletar pares de variáveis (curto e longo prazo)
-    pares_variaveis = []
+    # Coletar pares candidatos (curto e longo prazo)
+    candidatos = []
     
     for dimensao, periodos in mapeamento.items():
         print(f"\nProcessando dimensão: {ascii_safe(dimensao)}")
@@ -141,37 +207,91 @@ def gerar_grafico_dispersao_temporal() -> Path:
         variaveis_curto = periodos.get("curto_prazo_2026_2027", [])
         variaveis_longo = periodos.get("longo_prazo_2035", [])
         
+        # Índice base -> variável de longo prazo (a primeira de cada base prevalece)
+        longo_por_base = {}
+        for vl in variaveis_longo:
+            longo_por_base.setdefault(vl.split(' [')[0], vl)
+        
         # Encontrar correspondências
         for var_curto in variaveis_curto:
             # Extrair base da variável (sem o período)
             base_variavel = var_curto.split(' [')[0]
             
             # Procurar correspondente no longo prazo
-            var_longo = None
-            for vl in variaveis_longo:
-                if vl.startswith(base_variavel):
-                    var_longo = vl
-                    break
+            var_longo = longo_por_base.get(base_variavel)
             
             if var_longo and var_curto in analisador.dados_brutos and var_longo in analisador.dados_brutos:
-                # Calcular estatísticas
-                stats_curto = analisador.analisar_frequencias_likert(analisador.dados_brutos[var_curto])
-                stats_longo = analisador.analisar_frequencias_likert(analisador.dados_brutos[var_longo])
-                
-                if stats_curto and stats_longo:
-                    # Gerar label sucinto
-                    label_completo = analisador.gerar_label_sucinto(var_curto, incluir_numero=True)
-                    label_sucinto = ascii_safe(gerar_label_sucinto_dispersao(var_curto))
-                    
-                    pares_variaveis.append({
-                        'variavel': var_curto,
-                        'label': label_sucinto,
-                        'dimensao': dimensao,
-                        'stats_curto': stats_curto,
-                        'stats_longo': stats_longo,
-                        'cor': CORES_DIMENSAO[dimensao],
-                        'nome_dimensao': NOMES_DIMENSAO[dimensao]
-                    })
+                candidatos.append((dimensao, var_curto, var_longo))
+    
+    # Mediana e IQR de todas as colunas envolvidas, calculadas uma única vez
+    colunas = list(dict.fromkeys(col for _, var_curto, var_longo in candidatos for col in (var_curto, var_longo)))
+    stats_por_coluna = calcular_mediana_iqr(analisador.dados_brutos, colunas)
+    
+    # Coletar pares de variáveis (curto e longo prazo)
+    pares_variaveis = []
+    
+    for dimensao, var_curto, var_longo in candidatos:
+        stats_curto = stats_por_coluna[var_curto]
+        stats_longo = stats_por_coluna[var_longo]
+        
+        if stats_curto and stats_longo:
+            # Gerar label sucinto
+            label_completo = analisador.gerar_label_sucinto(var_curto, incluir_numero=True)
+            label_sucinto = ascii_safe(gerar_label_sucinto_dispersao(var_curto))
+            
+            pares_variaveis.append({
+                'variavel': var_curto,
+                'label': label_sucinto,
+                'dimensao': dimensao,
+                'stats_curto': stats_curto,
+                'stats_longo': stats_longo,
+                'cor': CORES_DIMENSAO[dimensao],
+                'nome_dimensao': NOMES_DIMENSAO[dimensao]
+            })
+    
+    return pares_variaveis
+
+def carregar_pares_variaveis(caminho_cache: Path = CACHE_PARES) -> List[Dict]:
+    """
+    Obtém os pares de variáveis, reaproveitando o resultado salvo em disco.
+    
+    O cache só é usado quando é mais recente que a planilha, que este script e
+    que analise_likert_riscos.py (de onde vêm os rótulos e o mapeamento das
+    dimensões); caso contrário os pares são recalculados e o cache é regravado.
+    
+    Args:
+        caminho_cache: Arquivo pickle com os pares da última execução
+        
+    Returns:
+        Lista de pares com estatísticas, rótulo e cor da dimensão
+    """
+    analisador = AnalisadorRiscosLikert()
+    fontes = (Path(analisador.excel_file), Path(__file__), Path(analise_likert_riscos.__file__))
+    
+    if caminho_cache.exists():
+        mtime_cache = caminho_cache.stat().st_mtime
+        if all(fonte.stat().st_mtime <= mtime_cache for fonte in fontes):
+            print(f"Pares de variáveis carregados do cache: {caminho_cache}")
+            with caminho_cache.open('rb') as arquivo:
+                return pickle.load(arquivo)
+    
+    pares_variaveis = coletar_pares_variaveis(analisador)
+    
+    salvar_pickle_atomico(pares_variaveis, caminho_cache)
+    
+    return pares_variaveis
+
+def gerar_grafico_dispersao_temporal() -> Path:
+    """
+    Gera grafico de dispersao comparando curto prazo vs longo prazo.
+    
+    Returns:
+        Path do arquivo gerado
+    """
+    print("Gerando gráfico de dispersão temporal...")
+    
+    # Pares (curto e longo prazo) reaproveitados do cache quando a planilha não mudou
+    pares_variaveis = carregar_pares_variaveis()
     
     if not pares_variaveis:
         print("Nenhum par de variáveis encontrado para análise.")
@@ -182,40 +302,36 @@ def gerar_grafico_dispersao_temporal() -> Path:
     # Aplicar filtros estatísticos
     dados_filtrados = aplicar_filtros_estatisticos(pares_variaveis)
     
-    if not dados_filtrados:
+    if not len(dados_filtrados['pars']):
         print("Nenhuma variável passou pelos filtros estatísticos.")
         return None
     
     # Preparar dados para o gráfico
-    x_vals = [par['stats_curto']['mediana'] for par in dados_filtrados]
-    y_vals = [par['stats_longo']['mediana'] for par in dados_filtrados]
-    cores = [par['cor'] for par in dados_filtrados]
-    tamanhos = [par['variabilidade_media'] * 200 + 50 for par in dados_filtrados]  # Escalar para visualização
-    labels = [par['label'] for par in dados_filtrados]
+    pares = dados_filtrados['pars']
+    x_vals = dados_filtrados['xs']
+    y_vals = dados_filtrados['ys']
+    cores = _COLOR_ARR[dados_filtrados['dim_idx']]
+    tamanhos = dados_filtrados['var'] * 200 + 50  # Escalar para visualização
     
     # Criar gráfico
-    plt.figure(figsize=(14, 10))
-    
-    # Configurar estilo
-    sns.set_style("whitegrid")
-    plt.style.use('default')
+    fig, ax = plt.subplots(figsize=(14, 10))
     
     # Criar scatter plot
-    scatter = plt.scatter(x_vals, y_vals, c=cores, s=tamanhos, alpha=0.7, 
-                       edgecolors='black', linewidth=1.5)
+    scatter = ax.scatter(x_vals, y_vals, c=cores, s=tamanhos, alpha=0.7, 
+                         edgecolors='black', linewidth=1.5, rasterized=True)
     
     # Adicionar linhas de referência
     # Linha diagonal (y=x) - riscos estáveis
-    plt.plot([1, 5], [1, 5], 'k--', alpha=0.5, linewidth=2, label='Riscos Estáveis (y=x)')
+    ax.plot([1, 5], [1, 5], 'k--', alpha=0.5, linewidth=2, label='Riscos Estáveis (y=x)')
     
     # Linhas verticais e horizontais em mediana=3.0 (limiar neutro)
-    plt.axvline(x=3.0, color='orange', linestyle='--', alpha=0.5, linewidth=1.5, label='Limiar Neutro')
-    plt.axhline(y=3.0, color='orange', linestyle='--', alpha=0.5, linewidth=1.5)
+    ax.axvline(x=3.0, color='orange', linestyle='--', alpha=0.5, linewidth=1.5, label='Limiar Neutro')
+    ax.axhline(y=3.0, color='orange', linestyle='--', alpha=0.5, linewidth=1.5)
     
     # Configurar eixos
-    plt.xlabel('Mediana Curto Prazo (2026-2027)', fontsize=14, fontweight='bold')
-    plt.ylabel('Mediana Longo Prazo (até 2035)', fontsize=14, fontweight='bold')
-    plt.title(
+    ax.set_xlabel('Mediana Curto Prazo (2026-2027)', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Mediana Longo Prazo (até 2035)', fontsize=14, fontweight='bold')
+    ax.set_title(
         'Análise de Dispersão Temporal de Riscos\n'
         'Relação entre Percepção de Curto e Longo Prazo',
         fontsize=16,
@@ -224,26 +340,26 @@ def gerar_grafico_dispersao_temporal() -> Path:
     )
     
     # Limites dos eixos
-    plt.xlim(1.5, 5.5)
-    plt.ylim(1.5, 5.5)
-    plt.xticks(np.arange(2, 6))
-    plt.yticks(np.arange(2, 6))
+    ax.set_xlim(1.5, 5.5)
+    ax.set_ylim(1.5, 5.5)
+    ax.set_xticks(np.arange(2, 6))
+    ax.set_yticks(np.arange(2, 6))
     
     # Adicionar grid
-    plt.grid(True, alpha=0.3)
+    ax.grid(True, alpha=0.3)
     
     # Adicionar labels para pontos principais (top 10 por variabilidade)
-    pontos_ordenados = sorted(dados_filtrados, key=lambda x: x['variabilidade_media'], reverse=True)[:10]
-    for par in pontos_ordenados:
-        x_pos = par['stats_curto']['mediana']
-        y_pos = par['stats_longo']['mediana']
-        label = par['label']
+    pontos_ordenados = heapq.nlargest(10, range(len(pares)), key=dados_filtrados['var'].__getitem__)
+    for i in pontos_ordenados:
+        x_pos = x_vals[i]
+        y_pos = y_vals[i]
+        label = pares[i]['label']
         
         # Ajustar posição para evitar sobreposição
         offset_x = 0.1 if x_pos < 4 else -0.3
         offset_y = 0.1 if y_pos < 4 else -0.2
         
-        plt.annotate(
+        ax.annotate(
             label,
             (x_pos, y_pos),
             xytext=(offset_x, offset_y),
@@ -254,49 +370,53 @@ def gerar_grafico_dispersao_temporal() -> Path:
         )
     
     # Legenda de cores por dimensão
-    legend_elements = []
-    dimensoes_unicas = set(par['dimensao'] for par in dados_filtrados)
-    for dimensao in dimensoes_unicas:
-        legend_elements.append(
-            plt.scatter([], [], c=CORES_DIMENSAO[dimensao], s=100, 
-                      label=NOMES_DIMENSAO[dimensao], alpha=0.7, edgecolors='black')
-        )
+    # (marcadores Line2D avulsos, sem criar coleções vazias no eixo)
+    dimensoes_unicas = set(dados_filtrados['dims'])
+    legend_elements = [
+        Line2D([0], [0], linestyle='none', marker='o', markersize=10,
+               markerfacecolor=CORES_DIMENSAO[dimensao], markeredgecolor='black',
+               markeredgewidth=1.5, alpha=0.7, label=NOMES_DIMENSAO[dimensao])
+        for dimensao in dimensoes_unicas
+    ]
     
     # Legenda combinada
-    legend1 = plt.legend(handles=legend_elements, loc='upper left', 
-                     title='Dimensões', framealpha=0.95, fontsize=10)
-    legend2 = plt.legend(loc='lower right', framealpha=0.95, fontsize=9)
-    plt.gca().add_artist(legend1)
+    legend1 = ax.legend(handles=legend_elements, loc='upper left', 
+                        title='Dimensões', framealpha=0.95, fontsize=10)
+    legend2 = ax.legend(loc='lower right', framealpha=0.95, fontsize=9)
+    ax.add_artist(legend1)
     
     # Adicionar texto explicativo dos quadrantes
-    plt.figtext(0.02, 0.98, 'Q1: Riscos Crônicos\n(Alto-Alto)', 
-                transform=plt.gca().transAxes, fontsize=9, fontweight='bold',
-                verticalalignment='top', bbox=dict(boxstyle="round,pad=0.3", 
-                facecolor='lightcoral', alpha=0.7))
-    
-    plt.figtext(0.02, 0.02, 'Q3: Riscos Controlados\n(Baixo-Baixo)', 
-                transform=plt.gca().transAxes, fontsize=9, fontweight='bold',
-                verticalalignment='bottom', bbox=dict(boxstyle="round,pad=0.3", 
-                facecolor='lightgreen', alpha=0.7))
-    
-    plt.figtext(0.98, 0.98, 'Q2: Riscos Emergentes\n(Baixo-Alto)', 
-                transform=plt.gca().transAxes, fontsize=9, fontweight='bold',
-                verticalalignment='top', horizontalalignment='right',
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='lightyellow', alpha=0.7))
-    
-    plt.figtext(0.98, 0.02, 'Q4: Riscos em Melhoria\n(Alto-Baixo)', 
-                transform=plt.gca().transAxes, fontsize=9, fontweight='bold',
-                verticalalignment='bottom', horizontalalignment='right',
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='lightblue', alpha=0.7))
-    
-    plt.tight_layout()
+    fig.text(0.02, 0.98, 'Q1: Riscos Crônicos\n(Alto-Alto)', 
+             transform=ax.transAxes, fontsize=9, fontweight='bold',
+             verticalalignment='top', bbox=dict(boxstyle="round,pad=0.3", 
+             facecolor='lightcoral', alpha=0.7))
+    
+    fig.text(0.02, 0.02, 'Q3: Riscos Controlados\n(Baixo-Baixo)', 
+             transform=ax.transAxes, fontsize=9, fontweight='bold',
+             verticalalignment='bottom', bbox=dict(boxstyle="round,pad=0.3", 
+             facecolor='lightgreen', alpha=0.7))
+    
+    fig.text(0.98, 0.98, 'Q2: Riscos Emergentes\n(Baixo-Alto)', 
+             transform=ax.transAxes, fontsize=9, fontweight='bold',
+             verticalalignment='top', horizontalalignment='right',
+             bbox=dict(boxstyle="round,pad=0.3", facecolor='lightyellow', alpha=0.7))
+    
+    fig.text(0.98, 0.02, 'Q4: Riscos em Melhoria\n(Alto-Baixo)', 
+             transform=ax.transAxes, fontsize=9, fontweight='bold',
+             verticalalignment='bottom', horizontalalignment='right',
+             bbox=dict(boxstyle="round,pad=0.3", facecolor='lightblue', alpha=0.7))
+    
+    # Margens fixas (medidas uma vez com tight_layout para este layout 14x10),
+    # evitando o recálculo das caixas de todos os textos e legendas
+    fig.subplots_adjust(left=0.045, right=0.985, top=0.905, bottom=0.065)
     
     # Salvar gráfico
     caminho_saida = Path("quarto/assets/graficos_agrupados/grafico_dispersao_temporal_riscos.png")
     caminho_saida.parent.mkdir(parents=True, exist_ok=True)
     
-    plt.savefig(caminho_saida, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    # margens já definidas acima: uma única renderização, sem recorte 'tight'
+    fig.savefig(caminho_saida, dpi=300, facecolor='white')
+    plt.close(fig)
     
     print(f"Gráfico salvo em: {caminho_saida}")
     
@@ -305,60 +425,57 @@ def gerar_grafico_dispersao_temporal() -> Path:
     
     return caminho_saida
 
-def gerar_analise_estatistica_dispersao(dados_filtrados: List[Dict]):
+def gerar_analise_estatistica_dispersao(dados_filtrados: Dict[str, object]):
     """
     Gera análise estatística detalhada do gráfico de dispersão.
     
     Args:
-        dados_filtrados: Lista com dados filtrados para análise
+        dados_filtrados: Arrays paralelos produzidos por aplicar_filtros_estatisticos
     """
-    print("\n" + "="*70)
-    print("ANÁLISE ESTATÍSTICA - GRÁFICO DE DISPERSÃO TEMPORAL")
-    print("="*70)
+    # Relatório acumulado em memória e enviado ao console de uma só vez
+    saida = io.StringIO()
+    escrever = partial(print, file=saida)
+    
+    escrever("\n" + "="*70)
+    escrever("ANÁLISE ESTATÍSTICA - GRÁFICO DE DISPERSÃO TEMPORAL")
+    escrever("="*70)
     
     # Estatísticas gerais
-    x_vals = [par['stats_curto']['mediana'] for par in dados_filtrados]
-    y_vals = [par['stats_longo']['mediana'] for par in dados_filtrados]
-    deltas = [par['delta_temporal'] for par in dados_filtrados]
-    
-    print(f"\nESTATÍSTICAS GERAIS:")
-    print(f"Total de variáveis analisadas: {len(dados_filtrados)}")
-    print(f"Mediana curto prazo - Média: {np.mean(x_vals):.2f} | Desvio: {np.std(x_vals):.2f}")
-    print(f"Mediana longo prazo - Média: {np.mean(y_vals):.2f} | Desvio: {np.std(y_vals):.2f}")
-    print(f"Delta temporal médio: {np.mean(deltas):.2f}")
-    
-    # Análise por dimensão
-    analise_dimensoes = {}
-    for par in dados_filtrados:
-        dimensao = par['dimensao']
-        if dimensao not in analise_dimensoes:
-            analise_dimensoes[dimensao] = {
-                'count': 0,
-                'x_vals': [],
-                'y_vals': [],
-                'deltas': [],
-                'riscos': []
-            }
-        
-        analise_dimensoes[dimensao]['count'] += 1
-        analise_dimensoes[dimensao]['x_vals'].append(par['stats_curto']['mediana'])
-        analise_dimensoes[dimensao]['y_vals'].append(par['stats_longo']['mediana'])
-        analise_dimensoes[dimensao]['deltas'].append(par['delta_temporal'])
-        analise_dimensoes[dimensao]['riscos'].append(par)
-    
-    print(f"\nANÁLISE POR DIMENSÃO:")
-    print("-" * 50)
-    
-    for dimensao, dados in analise_dimensoes.items():
-        media_x = np.mean(dados['x_vals'])
-        media_y = np.mean(dados['y_vals'])
-        media_delta = np.mean(dados['deltas'])
+    pares = dados_filtrados['pars']
+    x_vals = dados_filtrados['xs']
+    y_vals = dados_filtrados['ys']
+    deltas = dados_filtrados['delta']
+    variabilidade = dados_filtrados['var']
+    dims = dados_filtrados['dims']
+    
+    escrever(f"\nESTATÍSTICAS GERAIS:")
+    escrever(f"Total de variáveis analisadas: {len(pares)}")
+    escrever(f"Mediana curto prazo - Média: {np.mean(x_vals):.2f} | Desvio: {np.std(x_vals):.2f}")
+    escrever(f"Mediana longo prazo - Média: {np.mean(y_vals):.2f} | Desvio: {np.std(y_vals):.2f}")
+    escrever(f"Delta temporal médio: {np.mean(deltas):.2f}")
+    
+    # Análise por dimensão (na ordem em que as dimensões aparecem)
+    escrever(f"\nANÁLISE POR DIMENSÃO:")
+    escrever("-" * 50)
+    
+    # Somas e contagens de todas as dimensões em uma única passada
+    dim_idx, dimensoes = pd.factorize(dims)
+    contagens = np.bincount(dim_idx, minlength=len(dimensoes))
+    medias_x = np.bincount(dim_idx, weights=x_vals, minlength=len(dimensoes)) / contagens
+    medias_y = np.bincount(dim_idx, weights=y_vals, minlength=len(dimensoes)) / contagens
+    medias_delta = np.bincount(dim_idx, weights=deltas, minlength=len(dimensoes)) / contagens
+    
+    for d, dimensao in enumerate(dimensoes):
+        indices = np.flatnonzero(dim_idx == d)
+        media_x = medias_x[d]
+        media_y = medias_y[d]
+        media_delta = medias_delta[d]
         
-        print(f"\n{NOMES_DIMENSAO[dimensao]}:")
-        print(f"  Quantidade: {dados['count']} riscos")
-        print(f"  Média curto prazo: {media_x:.2f}")
-        print(f"  Média longo prazo: {media_y:.2f}")
-        print(f"  Delta médio: {media_delta:.2f}")
+        escrever(f"\n{NOMES_DIMENSAO[dimensao]}:")
+        escrever(f"  Quantidade: {contagens[d]} riscos")
+        escrever(f"  Média curto prazo: {media_x:.2f}")
+        escrever(f"  Média longo prazo: {media_y:.2f}")
+        escrever(f"  Delta médio: {media_delta:.2f}")
         
         # Classificar tendência
         if media_delta > 0.5:
@@ -370,60 +487,53 @@ def gerar_analise_estatistica_dispersao(dados_filtrados: List[Dict]):
         else:
             tendencia = "Melhoria"
         
-        print(f"  Tendência: {tendencia}")
+        escrever(f"  Tendência: {tendencia}")
         
         # Top 3 riscos da dimensão
-        riscos_ordenados = sorted(dados['riscos'], key=lambda x: x['variabilidade_media'], reverse=True)
-        print(f"  Top 3 por variabilidade:")
-        for i, risco in enumerate(riscos_ordenados[:3], 1):
-            print(f"    {i}. {risco['label']}: Δ={risco['delta_temporal']:.2f}")
+        riscos_ordenados = heapq.nlargest(3, indices, key=variabilidade.__getitem__)
+        escrever(f"  Top 3 por variabilidade:")
+        for i, idx in enumerate(riscos_ordenados, 1):
+            escrever(f"    {i}. {pares[idx]['label']}: Δ={deltas[idx]:.2f}")
     
     # Análise dos quadrantes
-    print(f"\nANÁLISE DOS QUADRANTES:")
-    print("-" * 40)
-    
-    q1 = []  # Alto-Alto (crônicos)
-    q2 = []  # Baixo-Alto (emergentes)
-    q3 = []  # Baixo-Baixo (controlados)
-    q4 = []  # Alto-Baixo (melhoria)
-    
-    for par in dados_filtrados:
-        x = par['stats_curto']['mediana']
-        y = par['stats_longo']['mediana']
-        
-        if x >= 3.0 and y >= 3.0:
-            q1.append(par)
-        elif x < 3.0 and y >= 3.0:
-            q2.append(par)
-        elif x < 3.0 and y < 3.0:
-            q3.append(par)
-        else:  # x >= 3.0 and y < 3.0
-            q4.append(par)
-    
-    print(f"Q1 - Riscos Crônicos (Alto-Alto): {len(q1)} variáveis")
-    if q1:
-        top_q1 = sorted(q1, key=lambda x: (x['stats_curto']['mediana'] + x['stats_longo']['mediana'])/2, reverse=True)[:3]
-        for i, risco in enumerate(top_q1, 1):
-            print(f"  {i}. {risco['label']} ({risco['nome_dimensao']})")
-    
-    print(f"\nQ2 - Riscos Emergentes (Baixo-Alto): {len(q2)} variáveis")
-    if q2:
-        top_q2 = sorted(q2, key=lambda x: x['delta_temporal'], reverse=True)[:3]
-        for i, risco in enumerate(top_q2, 1):
-            print(f"  {i}. {risco['label']} ({risco['nome_dimensao']}) - Δ={risco['delta_temporal']:.2f}")
-    
-    print(f"\nQ3 - Riscos Controlados (Baixo-Baixo): {len(q3)} variáveis")
-    print(f"\nQ4 - Riscos em Melhoria (Alto-Baixo): {len(q4)} variáveis")
-    if q4:
-        top_q4 = sorted(q4, key=lambda x: -x['delta_temporal'], reverse=True)[:3]
-        for i, risco in enumerate(top_q4, 1):
-            print(f"  {i}. {risco['label']} ({risco['nome_dimensao']}) - Δ={risco['delta_temporal']:.2f}")
+    escrever(f"\nANÁLISE DOS QUADRANTES:")
+    escrever("-" * 40)
+    
+    # Código do quadrante: 0=Q3 (Baixo-Baixo), 1=Q4 (Alto-Baixo), 2=Q2 (Baixo-Alto), 3=Q1 (Alto-Alto)
+    quadrante = (x_vals >= 3.0).astype(np.uint8) + 2 * (y_vals >= 3.0).astype(np.uint8)
+    contagem_q3, contagem_q4, contagem_q2, contagem_q1 = np.bincount(quadrante, minlength=4)
+    q1 = np.flatnonzero(quadrante == 3)  # Alto-Alto (crônicos)
+    q2 = np.flatnonzero(quadrante == 2)  # Baixo-Alto (emergentes)
+    q4 = np.flatnonzero(quadrante == 1)  # Alto-Baixo (melhoria)
+    
+    escrever(f"Q1 - Riscos Crônicos (Alto-Alto): {contagem_q1} variáveis")
+    if contagem_q1:
+        top_q1 = heapq.nlargest(3, q1, key=dados_filtrados['mediana_comb'].__getitem__)
+        for i, idx in enumerate(top_q1, 1):
+            escrever(f"  {i}. {pares[idx]['label']} ({pares[idx]['nome_dimensao']})")
+    
+    escrever(f"\nQ2 - Riscos Emergentes (Baixo-Alto): {contagem_q2} variáveis")
+    if contagem_q2:
+        top_q2 = heapq.nlargest(3, q2, key=deltas.__getitem__)
+        for i, idx in enumerate(top_q2, 1):
+            escrever(f"  {i}. {pares[idx]['label']} ({pares[idx]['nome_dimensao']}) - Δ={deltas[idx]:.2f}")
+    
+    escrever(f"\nQ3 - Riscos Controlados (Baixo-Baixo): {contagem_q3} variáveis")
+    escrever(f"\nQ4 - Riscos em Melhoria (Alto-Baixo): {contagem_q4} variáveis")
+    if contagem_q4:
+        top_q4 = heapq.nsmallest(3, q4, key=deltas.__getitem__)
+        for i, idx in enumerate(top_q4, 1):
+            escrever(f"  {i}. {pares[idx]['label']} ({pares[idx]['nome_dimensao']}) - Δ={deltas[idx]:.2f}")
     
     # Correlação geral
     if len(x_vals) > 1 and len(y_vals) > 1:
-        correlacao = np.corrcoef(x_vals, y_vals)[0, 1]
-        print(f"\nCORRELAÇÃO TEMPORAL:")
-        print(f"Coeficiente de correlação: {correlacao:.3f}")
+        # Pearson direto sobre os arrays, sem montar a matriz 2x2 do np.corrcoef
+        desvio_x = x_vals - x_vals.mean()
+        desvio_y = y_vals - y_vals.mean()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlacao = (desvio_x * desvio_y).mean() / (x_vals.std() * y_vals.std())
+        escrever(f"\nCORRELAÇÃO TEMPORAL:")
+        escrever(f"Coeficiente de correlação: {correlacao:.3f}")
         
         if correlacao > 0.7:
             interpretacao = "Forte correlação positiva (riscos estáveis)"
@@ -434,9 +544,11 @@ def gerar_analise_estatistica_dispersao(dados_filtrados: List[Dict]):
         else:
             interpretacao = "Correlação negativa (mudança de padrão)"
         
-        print(f"Interpretação: {interpretacao}")
+        escrever(f"Interpretação: {interpretacao}")
+    
+    escrever("\n" + "="*70)
     
-    print("\n" + "="*70)
+    sys.stdout.write(saida.getvalue())
 
 def main():
     """Função principal."""
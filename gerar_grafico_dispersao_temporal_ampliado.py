@@ -6,21 +6,38 @@ com distribuicao de pontos sem sobreposicao e analises estatisticas detalhadas.
 
 from __future__ import annotations
 
-import math
+import logging
 import re
 import sys
 import unicodedata
 from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+import matplotlib
+matplotlib.use("Agg")  # geracao apenas de arquivos PNG, sem interface grafica
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 import seaborn as sns
 
+from matplotlib.figure import Figure
 from matplotlib.lines import Line2D
 
 from analise_likert_riscos import AnalisadorRiscosLikert
+from _publicacao import PNG_PIL_KWARGS
+
+# Mensagens vao para o stdout sem prefixo, como os antigos prints; em modo
+# batch basta logger.setLevel(logging.WARNING) para silenciar o relatorio
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
 
 # Cores por dimensao
 CORES_DIMENSAO = {
@@ -48,12 +65,47 @@ CORES_QUADRANTE = {
     "Q4": "#4575B4",  # Azul
 }
 
+# Estilo compartilhado pelas anotacoes dos pontos rotulados
+BBOX_ROTULO = dict(
+    boxstyle="round,pad=0.3",
+    facecolor="white",
+    alpha=0.94,
+    edgecolor="#555555",
+    linewidth=0.8,
+)
+SETA_ROTULO = dict(
+    arrowstyle="->",
+    connectionstyle="arc3,rad=0.08",
+    color="#666666",
+    alpha=0.7,
+    linewidth=0.8,
+)
+
 # --------------------------------------------------------------------------- #
 # Utilitarios
 # --------------------------------------------------------------------------- #
 
+# Numero da variavel no inicio do nome (ex.: "1.1")
+_NUM_RE = re.compile(r"^(\d+\.\d+)")
+
+# Acentos do portugues mapeados direto para a letra base
+_FOLD = str.maketrans(
+    "áàâãäéèêëíïóôõöúüçÁÀÂÃÄÉÈÊËÍÏÓÔÕÖÚÜÇ",
+    "aaaaaeeeeiioooouucAAAAAEEEEIIOOOOUUC",
+)
+
+
+# Palavras mantidas no label mesmo quando ultrapassam o limite
+_PALAVRAS_CHAVE_LABEL = frozenset({"risco", "impacto", "crise", "piora", "aumento", "mudancas"})
+
+
+@lru_cache(maxsize=512)
 def ascii_safe(texto: str) -> str:
     """Remove acentos para evitar problemas em terminais Windows."""
+    texto = texto.translate(_FOLD)
+    if texto.isascii():
+        return texto
+    # Outros caracteres acentuados: decomposicao NFKD completa
     return "".join(
         caractere
         for caractere in unicodedata.normalize("NFKD", texto)
@@ -69,17 +121,17 @@ def resumir_label_grafico(texto: str, limite: int = 35) -> str:
 
     palavras = texto.split()
     selecionadas: List[str] = []
+    comprimento = 0  # len(" ".join(selecionadas)), mantido incrementalmente
     for palavra in palavras:
-        candidato = " ".join(selecionadas + [palavra])
-        if len(candidato) <= limite - 3:
+        acrescimo = len(palavra) + (1 if selecionadas else 0)
+        if comprimento + acrescimo <= limite - 3:
             selecionadas.append(palavra)
+            comprimento += acrescimo
             continue
 
-        if palavra.lower() in {"risco", "impacto", "crise", "piora", "aumento", "mudancas"}:
+        if palavra.lower() in _PALAVRAS_CHAVE_LABEL:
             selecionadas.append(palavra)
-
-        if len(candidato) > limite - 3:
-            break
+        break
 
     if not selecionadas:
         selecionadas = palavras[:max(1, min(3, len(palavras)))]
@@ -114,34 +166,79 @@ def classificar_tendencia(delta_temporal: float) -> str:
     return "Estavel"
 
 
+def classificar_tendencias(deltas: np.ndarray) -> np.ndarray:
+    """Versao vetorizada de classificar_tendencia (mesmos limiares)."""
+    return np.select(
+        [
+            deltas >= 0.5,
+            deltas >= 0.2,
+            deltas <= -0.5,
+            deltas <= -0.2,
+            np.abs(deltas) > 0.05,
+        ],
+        [
+            "Piora significativa",
+            "Piora moderada",
+            "Melhora significativa",
+            "Melhora moderada",
+            "Alteracao leve",
+        ],
+        default="Estavel",
+    )
+
+
 # --------------------------------------------------------------------------- #
 # Preparacao de dados
 # --------------------------------------------------------------------------- #
 
+def calcular_mediana_iqr(dados: pd.DataFrame, colunas: List[str]) -> Dict[str, Dict]:
+    """
+    Calcula mediana e IQR de varias colunas Likert com um unico nanpercentile.
+
+    Colunas sem respostas numericas mapeiam para um dicionario vazio, como em
+    AnalisadorRiscosLikert.analisar_frequencias_likert.
+    """
+    if not colunas:
+        return {}
+
+    bloco = dados[colunas].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    validas = ~np.isnan(bloco).all(axis=0)
+
+    # Interpolacao linear, igual ao Series.quantile do pandas
+    q25, mediana, q75 = np.nanpercentile(bloco[:, validas], [25, 50, 75], axis=0)
+
+    stats: Dict[str, Dict] = {coluna: {} for coluna in colunas}
+    colunas_validas = [coluna for coluna, valida in zip(colunas, validas) if valida]
+    for coluna, med, iqr in zip(colunas_validas, mediana.tolist(), (q75 - q25).tolist()):
+        stats[coluna] = {"mediana": med, "iqr": iqr}
+    return stats
+
+
 def coletar_pares_variaveis(
     analisador: AnalisadorRiscosLikert,
 ) -> List[Dict]:
     """Gera a lista de pares (curto x longo prazo) para todas as dimensoes."""
     mapeamento = analisador.mapear_variaveis_por_dimensao()
+    candidatos_pares: List[Tuple[str, str, str]] = []
     pares_variaveis: List[Dict] = []
 
     for dimensao, periodos in mapeamento.items():
-        print(f"\n-- Processando dimensao: {ascii_safe(dimensao)}")
+        logger.info("\n-- Processando dimensao: %s", ascii_safe(dimensao))
         variaveis_curto = periodos.get("curto_prazo_2026_2027", [])
         variaveis_longo = periodos.get("longo_prazo_2035", [])
 
         if not variaveis_curto or not variaveis_longo:
-            print("   Nenhum par encontrado para os periodos requeridos.")
+            logger.info("   Nenhum par encontrado para os periodos requeridos.")
             continue
 
         indice_longo: Dict[str, List[str]] = defaultdict(list)
         for var_longo in variaveis_longo:
-            match = re.match(r"^(\d+\.\d+)", var_longo)
+            match = _NUM_RE.match(var_longo)
             if match:
                 indice_longo[match.group(1)].append(var_longo)
 
         for var_curto in variaveis_curto:
-            match = re.match(r"^(\d+\.\d+)", var_curto)
+            match = _NUM_RE.match(var_curto)
             if not match:
                 continue
 
@@ -157,49 +254,82 @@ def coletar_pares_variaveis(
             ):
                 continue
 
-            stats_curto = analisador.analisar_frequencias_likert(
-                analisador.dados_brutos[var_curto]
-            )
-            stats_longo = analisador.analisar_frequencias_likert(
-                analisador.dados_brutos[var_longo]
-            )
+            candidatos_pares.append((dimensao, var_curto, var_longo))
 
-            if not stats_curto or not stats_longo:
-                continue
+    # Mediana e IQR de todas as colunas envolvidas em uma unica reducao
+    colunas = list(dict.fromkeys(col for _, curto, longo in candidatos_pares for col in (curto, longo)))
+    stats = calcular_mediana_iqr(analisador.dados_brutos, colunas)
 
-            label_grafico, label_texto = gerar_labels_variavel(analisador, var_curto)
-
-            pares_variaveis.append(
-                {
-                    "variavel": var_curto,
-                    "label_grafico": label_grafico,
-                    "label_texto": label_texto,
-                    "dimensao": dimensao,
-                    "nome_dimensao": NOMES_DIMENSAO.get(dimensao, dimensao),
-                    "cor": CORES_DIMENSAO[dimensao],
-                    "stats_curto": stats_curto,
-                    "stats_longo": stats_longo,
-                }
-            )
+    for dimensao, var_curto, var_longo in candidatos_pares:
+        stats_curto = stats[var_curto]
+        stats_longo = stats[var_longo]
+
+        if not stats_curto or not stats_longo:
+            continue
+
+        label_grafico, label_texto = gerar_labels_variavel(analisador, var_curto)
 
-    print(f"\nTotal de pares mapeados: {len(pares_variaveis)}")
+        pares_variaveis.append(
+            {
+                "variavel": var_curto,
+                "label_grafico": label_grafico,
+                "label_texto": label_texto,
+                "dimensao": dimensao,
+                "nome_dimensao": NOMES_DIMENSAO.get(dimensao, dimensao),
+                "cor": CORES_DIMENSAO[dimensao],
+                "stats_curto": stats_curto,
+                "stats_longo": stats_longo,
+            }
+        )
+
+    logger.info("\nTotal de pares mapeados: %d", len(pares_variaveis))
     return pares_variaveis
 
 
-def preparar_dados_completos(dados_pares: List[Dict]) -> List[Dict]:
-    """Calcula metricas adicionais para cada par de variavel."""
-    print("== Preparando analise completa de dispersao temporal ==")
+def preparar_dados_completos(
+    dados_pares: List[Dict],
+) -> Tuple[List[Dict], Dict[str, np.ndarray]]:
+    """
+    Calcula metricas adicionais para cada par de variavel.
 
-    dados_preparados: List[Dict] = []
-    for par in dados_pares:
-        stats_curto = par["stats_curto"]
-        stats_longo = par["stats_longo"]
+    Retorna a lista de itens e, em paralelo, arrays NumPy alinhados a ela
+    ("med_curto", "med_longo", "iqr_curto", "iqr_longo", "iqr_media",
+    "mediana_combinada", "delta", "delta_abs", "dim_code") para as reducoes estatisticas e o dimensionamento dos pontos.
+    """
+    logger.info("== Preparando analise completa de dispersao temporal ==")
 
-        mediana_combinada = (stats_curto["mediana"] + stats_longo["mediana"]) / 2
-        delta_temporal = stats_longo["mediana"] - stats_curto["mediana"]
-        delta_absoluto = abs(delta_temporal)
-        variabilidade_media = (stats_curto["iqr"] + stats_longo["iqr"]) / 2
+    n = len(dados_pares)
+    arrays = {
+        nome: np.empty(n)
+        for nome in ("med_curto", "med_longo", "iqr_curto", "iqr_longo")
+    }
+    for i, par in enumerate(dados_pares):
+        arrays["med_curto"][i] = par["stats_curto"]["mediana"]
+        arrays["med_longo"][i] = par["stats_longo"]["mediana"]
+        arrays["iqr_curto"][i] = par["stats_curto"]["iqr"]
+        arrays["iqr_longo"][i] = par["stats_longo"]["iqr"]
+
+    arrays["mediana_combinada"] = (arrays["med_curto"] + arrays["med_longo"]) / 2
+    arrays["delta"] = arrays["med_longo"] - arrays["med_curto"]
+    arrays["delta_abs"] = np.abs(arrays["delta"])
+    arrays["iqr_media"] = (arrays["iqr_curto"] + arrays["iqr_longo"]) / 2
+
+    # Codigo inteiro da dimensao (ordem alfabetica) para reducoes agrupadas
+    dimensoes = sorted({par["dimensao"] for par in dados_pares})
+    codigo_dimensao = {dimensao: codigo for codigo, dimensao in enumerate(dimensoes)}
+    arrays["dim_code"] = np.fromiter(
+        (codigo_dimensao[par["dimensao"]] for par in dados_pares), dtype=np.intp, count=n
+    )
 
+    dados_preparados: List[Dict] = []
+    for par, mediana_combinada, delta_temporal, delta_absoluto, variabilidade_media, tendencia in zip(
+        dados_pares,
+        arrays["mediana_combinada"].tolist(),
+        arrays["delta"].tolist(),
+        arrays["delta_abs"].tolist(),
+        arrays["iqr_media"].tolist(),
+        classificar_tendencias(arrays["delta"]).tolist(),
+    ):
         dados_preparados.append(
             {
                 **par,
@@ -207,12 +337,12 @@ def preparar_dados_completos(dados_pares: List[Dict]) -> List[Dict]:
                 "delta_temporal": delta_temporal,
                 "delta_absoluto": delta_absoluto,
                 "variabilidade_media": variabilidade_media,
-                "tendencia": classificar_tendencia(delta_temporal),
+                "tendencia": tendencia,
             }
         )
 
-    print(f"Total de variaveis consideradas: {len(dados_preparados)}")
-    return dados_preparados
+    logger.info("Total de variaveis consideradas: %d", len(dados_preparados))
+    return dados_preparados, arrays
 
 
 def distribuir_pontos_sem_superposicao(
@@ -224,16 +354,31 @@ def distribuir_pontos_sem_superposicao(
 
     Retorna um dicionario com os clusters originais (coordenada base -> lista de itens).
     """
-    clusters: Dict[Tuple[float, float], List[Dict]] = defaultdict(list)
+    n_total = len(dados)
+    coordenadas = np.round(
+        np.column_stack(
+            [
+                np.fromiter((item["stats_curto"]["mediana"] for item in dados), dtype=float, count=n_total),
+                np.fromiter((item["stats_longo"]["mediana"] for item in dados), dtype=float, count=n_total),
+            ]
+        ),
+        4,
+    )
 
-    for item in dados:
-        chave = (
-            round(item["stats_curto"]["mediana"], 4),
-            round(item["stats_longo"]["mediana"], 4),
-        )
-        clusters[chave].append(item)
+    # Identificador de cluster por coordenada base em uma unica passada
+    bases, primeiros, cluster_ids, contagens = np.unique(
+        coordenadas, axis=0, return_index=True, return_inverse=True, return_counts=True
+    )
+    membros_ordenados = np.argsort(cluster_ids.ravel(), kind="stable")
+    limites = np.concatenate(([0], np.cumsum(contagens)))
 
-    for (base_x, base_y), elementos in clusters.items():
+    clusters: Dict[Tuple[float, float], List[Dict]] = {}
+
+    # Percorre os clusters na ordem de primeira ocorrencia, como antes
+    for cluster_id in np.argsort(primeiros, kind="stable").tolist():
+        base_x, base_y = bases[cluster_id].tolist()
+        elementos = [dados[i] for i in membros_ordenados[limites[cluster_id]:limites[cluster_id + 1]]]
+        clusters[(base_x, base_y)] = elementos
         n = len(elementos)
 
         if n == 1:
@@ -245,33 +390,25 @@ def distribuir_pontos_sem_superposicao(
         # Aumenta o raio base para melhor separação visual
         raio = min(0.45, raio_base + (n - 1) * 0.04)
         
+        indices = np.arange(n)
+
         # Usa espiral para melhor distribuição quando há muitos pontos
         if n <= 6:
             angulos = np.linspace(0, 2 * np.pi, n, endpoint=False)
         else:
-            # Distribuição em espiral para muitos pontos
-            angulos = []
-            for i in range(n):
-                angulo = (i * 2 * np.pi / n) + (i * 0.3)  # Adiciona rotação progressiva
-                angulos.append(angulo)
-
-        for i, elemento in enumerate(elementos):
-            if i < len(angulos):
-                angulo = angulos[i]
-            else:
-                angulo = (i * 2 * np.pi / n)
-            
-            # Varia o raio ligeiramente para criar mais separação
-            raio_variado = raio * (0.8 + 0.4 * (i / n))
-            
-            desloc_x = raio_variado * math.cos(angulo)
-            desloc_y = raio_variado * math.sin(angulo)
-            scatter_x = base_x + desloc_x
-            scatter_y = base_y + desloc_y
-
-            # Garante que o ponto permaneça dentro da escala Likert com margem
-            elemento["scatter_x"] = float(np.clip(scatter_x, 1.2, 4.8))
-            elemento["scatter_y"] = float(np.clip(scatter_y, 1.2, 4.8))
+            # Distribuição em espiral para muitos pontos (rotação progressiva)
+            angulos = (indices * 2 * np.pi / n) + (indices * 0.3)
+
+        # Varia o raio ligeiramente para criar mais separação
+        raios_variados = raio * (0.8 + 0.4 * (indices / n))
+
+        # Garante que os pontos permaneçam dentro da escala Likert com margem
+        scatter_x = np.clip(base_x + raios_variados * np.cos(angulos), 1.2, 4.8)
+        scatter_y = np.clip(base_y + raios_variados * np.sin(angulos), 1.2, 4.8)
+
+        for elemento, x, y in zip(elementos, scatter_x.tolist(), scatter_y.tolist()):
+            elemento["scatter_x"] = x
+            elemento["scatter_y"] = y
             elemento["cluster_tamanho"] = n
 
     return clusters
@@ -283,22 +420,18 @@ def gerar_resumo_quadrantes(
     """Organiza os itens por quadrante com base nos limiares informados."""
     quadrantes = {"Q1": [], "Q2": [], "Q3": [], "Q4": []}
 
-    for item in dados:
-        x_mediana = item["stats_curto"]["mediana"]
-        y_mediana = item["stats_longo"]["mediana"]
-
-        if x_mediana >= limiar_x and y_mediana >= limiar_y:
-            item["quadrante"] = "Q1"
-            quadrantes["Q1"].append(item)
-        elif x_mediana < limiar_x and y_mediana >= limiar_y:
-            item["quadrante"] = "Q2"
-            quadrantes["Q2"].append(item)
-        elif x_mediana < limiar_x and y_mediana < limiar_y:
-            item["quadrante"] = "Q3"
-            quadrantes["Q3"].append(item)
-        else:  # x_mediana >= limiar_x and y_mediana < limiar_y
-            item["quadrante"] = "Q4"
-            quadrantes["Q4"].append(item)
+    n = len(dados)
+    x_medianas = np.fromiter((item["stats_curto"]["mediana"] for item in dados), dtype=float, count=n)
+    y_medianas = np.fromiter((item["stats_longo"]["mediana"] for item in dados), dtype=float, count=n)
+
+    # Codigo de 2 bits: 0=Q2 (baixo x alto), 1=Q3 (baixo x baixo), 2=Q1 (alto x alto), 3=Q4 (alto x baixo)
+    codigos = (x_medianas >= limiar_x).astype(np.uint8) * 2 + (y_medianas < limiar_y).astype(np.uint8)
+    nomes = ("Q2", "Q3", "Q1", "Q4")
+
+    for item, codigo in zip(dados, codigos.tolist()):
+        quadrante = nomes[codigo]
+        item["quadrante"] = quadrante
+        quadrantes[quadrante].append(item)
 
     return quadrantes
 
@@ -312,42 +445,43 @@ def selecionar_pontos_para_rotular(
 ) -> List[Dict]:
     """Seleciona um conjunto equilibrado de pontos para rotulagem com mais rótulos e melhor distribuição."""
     quadrantes = gerar_resumo_quadrantes(dados, limiar_x, limiar_y)
-    selecionados: List[Dict] = []
-
-    # Critérios de seleção mais refinados por quadrante
-    ordenadores = {
-        "Q1": lambda item: (
-            (item["stats_curto"]["mediana"] + item["stats_longo"]["mediana"]) / 2,  # Média mais alta
-            item["variabilidade_media"],  # Maior variabilidade
-            item.get("cluster_tamanho", 1),  # Maiores clusters
-        ),
-        "Q2": lambda item: (
-            item["delta_temporal"],  # Maior piora
-            item["variabilidade_media"],  # Maior variabilidade
-            item.get("cluster_tamanho", 1),  # Maiores clusters
-        ),
-        "Q3": lambda item: (
-            -item["delta_absoluto"],  # Menor mudança (mais estáveis)
-            item["variabilidade_media"],  # Maior variabilidade
-            item.get("cluster_tamanho", 1),  # Maiores clusters
-        ),
-        "Q4": lambda item: (
-            -item["delta_temporal"],  # Maior melhoria
-            item["variabilidade_media"],  # Maior variabilidade
-            item.get("cluster_tamanho", 1),  # Maiores clusters
-        ),
+
+    # Criterios extraidos uma vez para arrays alinhados a `dados`
+    n = len(dados)
+    posicao = {id(item): i for i, item in enumerate(dados)}
+    mediana_media = np.fromiter(
+        ((item["stats_curto"]["mediana"] + item["stats_longo"]["mediana"]) / 2 for item in dados),
+        dtype=float,
+        count=n,
+    )
+    variabilidade = np.fromiter((item["variabilidade_media"] for item in dados), dtype=float, count=n)
+    cluster = np.fromiter((item.get("cluster_tamanho", 1) for item in dados), dtype=float, count=n)
+    delta = np.fromiter((item["delta_temporal"] for item in dados), dtype=float, count=n)
+    delta_abs = np.fromiter((item["delta_absoluto"] for item in dados), dtype=float, count=n)
+
+    # Critério principal por quadrante; desempates por maior variabilidade e maiores clusters
+    criterio_principal = {
+        "Q1": mediana_media,  # Média mais alta
+        "Q2": delta,  # Maior piora
+        "Q3": -delta_abs,  # Menor mudança (mais estáveis)
+        "Q4": -delta,  # Maior melhoria
     }
 
+    def ordenar_decrescente(indices: np.ndarray, *chaves: np.ndarray) -> np.ndarray:
+        """Equivale a sorted(..., reverse=True) pelas chaves em ordem de prioridade."""
+        return indices[np.lexsort([-chave[indices] for chave in reversed(chaves)])]
+
+    selecionados: List[int] = []
+
     # Seleção balanceada por quadrante
     for nome_quadrante, itens in quadrantes.items():
         if not itens:
             continue
-            
+
         # Ordena por múltiplos critérios
-        itens_ordenados = sorted(
-            itens,
-            key=ordenadores[nome_quadrante],
-            reverse=True,
+        indices = np.array([posicao[id(item)] for item in itens])
+        itens_ordenados = ordenar_decrescente(
+            indices, criterio_principal[nome_quadrante], variabilidade, cluster
         )
         
         # Seleciona mais pontos em quadrantes mais populosos
@@ -357,49 +491,55 @@ def selecionar_pontos_para_rotular(
         elif len(itens) < 5:  # Quadrantes esparsos ganham menos
             ajuste_max = max(2, max_por_quadrante - 2)
             
-        selecionados.extend(itens_ordenados[:ajuste_max])
+        selecionados.extend(itens_ordenados[:ajuste_max].tolist())
 
     # Se ainda tiver espaço, adiciona pontos importantes restantes
     if len(selecionados) < limite_total:
-        restantes = [
-            item for item in dados if item not in selecionados
-        ]
+        restantes = np.ones(n, dtype=bool)
+        restantes[selecionados] = False
         
         # Prioriza clusters grandes e alta variabilidade
-        restantes_ordenados = sorted(
-            restantes,
-            key=lambda item: (
-                item.get("cluster_tamanho", 1) * 2,  # Dobra peso para clusters
-                item["variabilidade_media"] * 1.5,  # 1.5x peso para variabilidade
-                item["delta_absoluto"],  # Mudanças temporais
-            ),
-            reverse=True,
+        restantes_ordenados = ordenar_decrescente(
+            np.flatnonzero(restantes),
+            cluster * 2,  # Dobra peso para clusters
+            variabilidade * 1.5,  # 1.5x peso para variabilidade
+            delta_abs,  # Mudanças temporais
         )
 
         faltam = min(limite_total - len(selecionados), len(restantes_ordenados))
-        selecionados.extend(restantes_ordenados[:faltam])
+        selecionados.extend(restantes_ordenados[:faltam].tolist())
 
-    return selecionados[:limite_total]
+    return [dados[i] for i in selecionados[:limite_total]]
 
 
 # --------------------------------------------------------------------------- #
 # Visualizacao
 # --------------------------------------------------------------------------- #
 
-def gerar_grafico_dispersao_temporal_ampliado() -> Optional[Path]:
-    """Gera o grafico de dispersao temporal ampliado."""
-    print("=== GERANDO GRAFICO DE DISPERSAO TEMPORAL AMPLIADO ===")
+def gerar_grafico_dispersao_temporal_ampliado(fig: Optional[Figure] = None) -> Optional[Path]:
+    """
+    Gera o grafico de dispersao temporal ampliado.
+
+    Uma figura ja existente pode ser passada para reaproveitamento em pipelines
+    que geram varios graficos; ela e limpa e nao e fechada ao final.
+    """
+    logger.info("=== GERANDO GRAFICO DE DISPERSAO TEMPORAL AMPLIADO ===")
 
     analisador = AnalisadorRiscosLikert()
     analisador.carregar_dados()
 
     pares_variaveis = coletar_pares_variaveis(analisador)
     if not pares_variaveis:
-        print("Nenhum par de variaveis encontrado para a analise.")
+        logger.warning("Nenhum par de variaveis encontrado para a analise.")
         return None
 
-    dados_completos = preparar_dados_completos(pares_variaveis)
+    dados_completos, arrays = preparar_dados_completos(pares_variaveis)
     clusters = distribuir_pontos_sem_superposicao(dados_completos)
+    arrays["cluster_tamanho"] = np.fromiter(
+        (item["cluster_tamanho"] for item in dados_completos),
+        dtype=float,
+        count=len(dados_completos),
+    )
 
     limiar_x = 3.0
     limiar_y = 3.0
@@ -408,14 +548,16 @@ def gerar_grafico_dispersao_temporal_ampliado() -> Optional[Path]:
     x_vals = [item["scatter_x"] for item in dados_completos]
     y_vals = [item["scatter_y"] for item in dados_completos]
     cores = [CORES_QUADRANTE[item["quadrante"]] for item in dados_completos]
-    tamanhos = [
-        30 + item["variabilidade_media"] * 50 + (item.get("cluster_tamanho", 1) - 1) * 10
-        for item in dados_completos
-    ]
+    tamanhos = 30 + arrays["iqr_media"] * 50 + (arrays["cluster_tamanho"] - 1) * 10
 
     sns.set_style("whitegrid")
     plt.style.use("default")
-    fig, ax = plt.subplots(figsize=(16, 12))
+    figura_propria = fig is None
+    if figura_propria:
+        fig, ax = plt.subplots(figsize=(16, 12))
+    else:
+        fig.clf()
+        ax = fig.add_subplot()
 
     scatter = ax.scatter(
         x_vals,
@@ -425,6 +567,7 @@ def gerar_grafico_dispersao_temporal_ampliado() -> Optional[Path]:
         alpha=0.82,
         edgecolors="black",
         linewidth=1.1,
+        rasterized=True,
     )
 
     # Linhas de referencia
@@ -514,7 +657,10 @@ def gerar_grafico_dispersao_temporal_ampliado() -> Optional[Path]:
     ]
     offsets_usados: Dict[str, int] = defaultdict(int)
 
-    for item in itens_rotulados:
+    # Posições e offsets-base de todos os rótulos em uma passada
+    posicoes = np.empty((len(itens_rotulados), 2))
+    deslocamentos = np.empty((len(itens_rotulados), 2), dtype=int)
+    for i, item in enumerate(itens_rotulados):
         x_pos = item["scatter_x"]
         y_pos = item["scatter_y"]
 
@@ -531,49 +677,49 @@ def gerar_grafico_dispersao_temporal_ampliado() -> Optional[Path]:
             item["quadrante"] = quadrante
 
         offsets = offset_config.get(quadrante, default_offsets)
-        offset = offsets[offsets_usados[quadrante] % len(offsets)]
+        posicoes[i] = (x_pos, y_pos)
+        deslocamentos[i] = offsets[offsets_usados[quadrante] % len(offsets)]
         offsets_usados[quadrante] += 1
 
-        ha = "left" if offset[0] >= 0 else "right"
-        va = "bottom" if offset[1] >= 0 else "top"
-
-        # Ajuste fino baseado na posição para evitar bordas
-        if x_pos + offset[0]/100 > 4.8:  # Próximo da borda direita
-            offset = (-abs(offset[0]), offset[1])
-            ha = "right"
-        elif x_pos + offset[0]/100 < 1.2:  # Próximo da borda esquerda
-            offset = (abs(offset[0]), offset[1])
-            ha = "left"
-            
-        if y_pos + offset[1]/100 > 4.8:  # Próximo da borda superior
-            offset = (offset[0], -abs(offset[1]))
-            va = "top"
-        elif y_pos + offset[1]/100 < 1.2:  # Próximo da borda inferior
-            offset = (offset[0], abs(offset[1]))
-            va = "bottom"
+    # Ajuste fino baseado na posição para evitar bordas (vetorizado): cada eixo
+    # consulta a mesma tabela de direções, com a borda superior/direita prioritária
+    destino = posicoes + deslocamentos / 100
+    perto_fim = destino > 4.8  # Próximo da borda direita / superior
+    perto_inicio = destino < 1.2  # Próximo da borda esquerda / inferior
+    modulos = np.abs(deslocamentos)
+    ajustados = np.select([perto_fim, perto_inicio], [-modulos, modulos], default=deslocamentos)
+
+    # Alinhamento segue o offset original, exceto quando houve inversão na borda
+    positivos = deslocamentos >= 0
+    alinhamentos_h = np.select(
+        [perto_fim[:, 0], perto_inicio[:, 0], positivos[:, 0]],
+        ["right", "left", "left"],
+        default="right",
+    )
+    alinhamentos_v = np.select(
+        [perto_fim[:, 1], perto_inicio[:, 1], positivos[:, 1]],
+        ["top", "bottom", "bottom"],
+        default="top",
+    )
 
+    for item, (x_pos, y_pos), offset_x, offset_y, ha, va in zip(
+        itens_rotulados,
+        posicoes.tolist(),
+        ajustados[:, 0].tolist(),
+        ajustados[:, 1].tolist(),
+        alinhamentos_h.tolist(),
+        alinhamentos_v.tolist(),
+    ):
         ax.annotate(
             item["label_grafico"],
             (x_pos, y_pos),
-            xytext=offset,
+            xytext=(offset_x, offset_y),
             textcoords="offset points",
             fontsize=8.5,  # Fonte ligeiramente menor para caber mais rótulos
             ha=ha,
             va=va,
-            bbox=dict(
-                boxstyle="round,pad=0.3",
-                facecolor="white",
-                alpha=0.94,
-                edgecolor="#555555",
-                linewidth=0.8,
-            ),
-            arrowprops=dict(
-                arrowstyle="->",
-                connectionstyle="arc3,rad=0.08",
-                color="#666666",
-                alpha=0.7,
-                linewidth=0.8,
-            ),
+            bbox=BBOX_ROTULO,
+            arrowprops=SETA_ROTULO,
         )
 
     # Legenda por quadrante
@@ -693,12 +839,19 @@ def gerar_grafico_dispersao_temporal_ampliado() -> Optional[Path]:
 
     caminho_saida = Path("quarto/assets/graficos_agrupados/grafico_dispersao_temporal_riscos_ampliado.png")
     caminho_saida.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(caminho_saida, dpi=300, bbox_inches="tight", facecolor="white")
-    plt.close()
+    fig.savefig(
+        caminho_saida,
+        dpi=300,
+        bbox_inches="tight",
+        facecolor="white",
+        pil_kwargs=PNG_PIL_KWARGS,
+    )
+    if figura_propria:
+        plt.close(fig)
 
-    print(f"\n>> Grafico salvo em: {caminho_saida}")
+    logger.info("\n>> Grafico salvo em: %s", caminho_saida)
 
-    gerar_analise_estatistica_ampliada(dados_completos, resumo_quadrantes, limiar_x, limiar_y)
+    gerar_analise_estatistica_ampliada(dados_completos, arrays, resumo_quadrantes, limiar_x, limiar_y)
     return caminho_saida
 
 
@@ -708,72 +861,86 @@ def gerar_grafico_dispersao_temporal_ampliado() -> Optional[Path]:
 
 def gerar_analise_estatistica_ampliada(
     dados_completos: List[Dict],
+    arrays: Dict[str, np.ndarray],
     resumo_quadrantes: Dict[str, List[Dict]],
     limiar_x: float,
     limiar_y: float,
 ) -> None:
     """Imprime estatisticas e insights detalhados sobre a dispersao temporal."""
-    print("\n" + "=" * 86)
-    print("ANALISE ESTATISTICA COMPLETA - DISPERSAO TEMPORAL DE RISCOS")
-    print("=" * 86)
-
-    x_vals = [item["stats_curto"]["mediana"] for item in dados_completos]
-    y_vals = [item["stats_longo"]["mediana"] for item in dados_completos]
-    deltas = [item["delta_temporal"] for item in dados_completos]
-    deltas_abs = [item["delta_absoluto"] for item in dados_completos]
-
-    print("\n-- Estatisticas gerais")
-    print(f"Total de variaveis analisadas: {len(dados_completos)}")
-    print(f"Mediana curto prazo - media: {np.mean(x_vals):.2f} | desvio: {np.std(x_vals):.2f}")
-    print(f"Mediana longo prazo - media: {np.mean(y_vals):.2f} | desvio: {np.std(y_vals):.2f}")
-    print(f"Delta temporal medio: {np.mean(deltas):.2f}")
-    print(f"Variacao absoluta media: {np.mean(deltas_abs):.2f}")
-
-    correlacao = np.corrcoef(x_vals, y_vals)[0, 1] if len(dados_completos) > 1 else float("nan")
-    print(f"Correlacao de Pearson (curto x longo prazo): {correlacao:.3f}")
+    logger.info("\n%s", "=" * 86)
+    logger.info("ANALISE ESTATISTICA COMPLETA - DISPERSAO TEMPORAL DE RISCOS")
+    logger.info("=" * 86)
+
+    x_vals = arrays["med_curto"]
+    y_vals = arrays["med_longo"]
+    deltas = arrays["delta"]
+    deltas_abs = arrays["delta_abs"]
+
+    logger.info("\n-- Estatisticas gerais")
+    logger.info("Total de variaveis analisadas: %d", len(dados_completos))
+    logger.info("Mediana curto prazo - media: %.2f | desvio: %.2f", x_vals.mean(), x_vals.std())
+    logger.info("Mediana longo prazo - media: %.2f | desvio: %.2f", y_vals.mean(), y_vals.std())
+    logger.info("Delta temporal medio: %.2f", deltas.mean())
+    logger.info("Variacao absoluta media: %.2f", deltas_abs.mean())
+
+    correlacao = float("nan")
+    if x_vals.size > 1:
+        # Pearson direto sobre os arrays, sem montar a matriz 2x2 do np.corrcoef
+        desvio_x = x_vals - x_vals.mean()
+        desvio_y = y_vals - y_vals.mean()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            correlacao = (desvio_x * desvio_y).mean() / (x_vals.std() * y_vals.std())
+    logger.info("Correlacao de Pearson (curto x longo prazo): %.3f", correlacao)
     if correlacao > 0.7:
-        print("Interpretacao: padrao altamente persistente (riscos tendem a se manter elevados)")
+        logger.info("Interpretacao: padrao altamente persistente (riscos tendem a se manter elevados)")
     elif correlacao > 0.4:
-        print("Interpretacao: correlacao positiva moderada (pouca mudanca de hierarquia de riscos)")
+        logger.info("Interpretacao: correlacao positiva moderada (pouca mudanca de hierarquia de riscos)")
     elif correlacao > 0.1:
-        print("Interpretacao: correlacao fraca (espaco para mudancas relevantes)")
+        logger.info("Interpretacao: correlacao fraca (espaco para mudancas relevantes)")
     else:
-        print("Interpretacao: correlacao muito fraca (riscos com trajetorias divergentes)")
-
-    print("\n-- Analise por dimensao")
-    print("-" * 50)
-    por_dimensao: Dict[str, List[Dict]] = defaultdict(list)
-    for item in dados_completos:
-        por_dimensao[item["dimensao"]].append(item)
-
-    for dimensao, itens in sorted(por_dimensao.items()):
-        medias_curto = np.mean([i["stats_curto"]["mediana"] for i in itens])
-        medias_longo = np.mean([i["stats_longo"]["mediana"] for i in itens])
-        media_delta = np.mean([i["delta_temporal"] for i in itens])
-        media_abs = np.mean([i["delta_absoluto"] for i in itens])
-
-        print(f"{NOMES_DIMENSAO[dimensao]} ({len(itens)} variaveis)")
-        print(f"  Mediana curto prazo avg: {medias_curto:.2f}")
-        print(f"  Mediana longo prazo avg: {medias_longo:.2f}")
-        print(f"  Delta medio: {media_delta:.2f}")
-        print(f"  Variacao absoluta media: {media_abs:.2f}")
-        print(f"  Tendencia predominante: {classificar_tendencia(media_delta)}")
-
-        top_variabilidade = sorted(
-            itens,
-            key=lambda item: item["variabilidade_media"],
-            reverse=True,
-        )[:3]
-        print("  Top 3 variaveis por variabilidade:")
-        for idx, item in enumerate(top_variabilidade, start=1):
-            print(
-                f"    {idx}. {item['label_texto']} (delta={item['delta_temporal']:.2f}, "
-                f"IQR medio={item['variabilidade_media']:.2f})"
+        logger.info("Interpretacao: correlacao muito fraca (riscos com trajetorias divergentes)")
+
+    logger.info("\n-- Analise por dimensao")
+    logger.info("-" * 50)
+    # Uma unica reducao por metrica, agrupada pelo codigo da dimensao
+    dim_code = arrays["dim_code"]
+    contagens = np.bincount(dim_code)
+    medias_curto = np.bincount(dim_code, weights=x_vals) / contagens
+    medias_longo = np.bincount(dim_code, weights=y_vals) / contagens
+    medias_delta = np.bincount(dim_code, weights=deltas) / contagens
+    medias_abs = np.bincount(dim_code, weights=deltas_abs) / contagens
+
+    # Indices agrupados por dimensao (estavel: preserva a ordem original dentro do grupo)
+    ordem_dimensao = np.argsort(dim_code, kind="stable")
+    limites = np.concatenate(([0], np.cumsum(contagens)))
+    variabilidade = arrays["iqr_media"]
+    dimensoes = sorted({item["dimensao"] for item in dados_completos})
+
+    for codigo, dimensao in enumerate(dimensoes):
+        indices = ordem_dimensao[limites[codigo]:limites[codigo + 1]]
+
+        logger.info("%s (%d variaveis)", NOMES_DIMENSAO[dimensao], contagens[codigo])
+        logger.info("  Mediana curto prazo avg: %.2f", medias_curto[codigo])
+        logger.info("  Mediana longo prazo avg: %.2f", medias_longo[codigo])
+        logger.info("  Delta medio: %.2f", medias_delta[codigo])
+        logger.info("  Variacao absoluta media: %.2f", medias_abs[codigo])
+        logger.info("  Tendencia predominante: %s", classificar_tendencia(medias_delta[codigo]))
+
+        top_variabilidade = indices[np.argsort(-variabilidade[indices], kind="stable")[:3]]
+        logger.info("  Top 3 variaveis por variabilidade:")
+        for idx, posicao in enumerate(top_variabilidade, start=1):
+            item = dados_completos[posicao]
+            logger.info(
+                "    %d. %s (delta=%.2f, IQR medio=%.2f)",
+                idx,
+                item["label_texto"],
+                item["delta_temporal"],
+                item["variabilidade_media"],
             )
-        print()
+        logger.info("")
 
-    print("-- Analise por quadrante (limiar 3.0)")
-    print("-" * 50)
+    logger.info("-- Analise por quadrante (limiar 3.0)")
+    logger.info("-" * 50)
     descricoes_quadrante = {
         "Q1": "Riscos cronicos (alto x alto)",
         "Q2": "Riscos emergentes (baixo x alto)",
@@ -781,10 +948,15 @@ def gerar_analise_estatistica_ampliada(
         "Q4": "Riscos em melhoria (alto x baixo)",
     }
 
+    # Chaves de ordenacao sobre campos ja calculados em preparar_dados_completos
+    por_mediana_combinada = itemgetter("mediana_combinada")
+    por_delta = itemgetter("delta_temporal")
+    por_delta_absoluto = itemgetter("delta_absoluto")
+
     for codigo in ("Q1", "Q2", "Q3", "Q4"):
         itens = resumo_quadrantes[codigo]
         percentual = (len(itens) / len(dados_completos) * 100) if dados_completos else 0
-        print(f"{descricoes_quadrante[codigo]}: {len(itens)} variaveis ({percentual:.1f}%)")
+        logger.info("%s: %d variaveis (%.1f%%)", descricoes_quadrante[codigo], len(itens), percentual)
 
         if not itens:
             continue
@@ -792,64 +964,67 @@ def gerar_analise_estatistica_ampliada(
         if codigo == "Q1":
             destaque = sorted(
                 itens,
-                key=lambda item: (item["stats_curto"]["mediana"] + item["stats_longo"]["mediana"]) / 2,
+                key=por_mediana_combinada,
                 reverse=True,
             )[:5]
         elif codigo == "Q2":
             destaque = sorted(
                 itens,
-                key=lambda item: item["delta_temporal"],
+                key=por_delta,
                 reverse=True,
             )[:5]
         elif codigo == "Q3":
             destaque = sorted(
                 itens,
-                key=lambda item: item["delta_absoluto"],
+                key=por_delta_absoluto,
             )[:5]
         else:  # Q4
             destaque = sorted(
                 itens,
-                key=lambda item: item["delta_temporal"],
+                key=por_delta,
             )[:5]
 
         for idx, item in enumerate(destaque, start=1):
-            print(
-                f"  {idx}. {item['label_texto']} ({item['nome_dimensao']}) - "
-                f"curto={item['stats_curto']['mediana']:.2f} | "
-                f"longo={item['stats_longo']['mediana']:.2f} | "
-                f"delta={item['delta_temporal']:.2f}"
+            logger.info(
+                "  %d. %s (%s) - curto=%.2f | longo=%.2f | delta=%.2f",
+                idx,
+                item["label_texto"],
+                item["nome_dimensao"],
+                item["stats_curto"]["mediana"],
+                item["stats_longo"]["mediana"],
+                item["delta_temporal"],
             )
-        print()
+        logger.info("")
 
-    print("-- Insights estrategicos")
-    print("-" * 50)
+    logger.info("-- Insights estrategicos")
+    logger.info("-" * 50)
     maiores_pioras = sorted(
         dados_completos,
-        key=lambda item: item["delta_temporal"],
+        key=por_delta,
         reverse=True,
     )[:5]
     maiores_melhoras = sorted(
         dados_completos,
-        key=lambda item: item["delta_temporal"],
+        key=por_delta,
     )[:5]
 
-    print("Principais sinais de agravamento:")
+    logger.info("Principais sinais de agravamento:")
     for idx, item in enumerate(maiores_pioras, start=1):
         if item["delta_temporal"] <= 0:
             break
-        print(
-            f"  {idx}. {item['label_texto']} ({item['nome_dimensao']}) - delta +{item['delta_temporal']:.2f}"
+        logger.info(
+            "  %d. %s (%s) - delta +%.2f", idx, item["label_texto"], item["nome_dimensao"], item["delta_temporal"]
         )
 
-    print("\nPrincipais sinais de melhoria:")
+    logger.info("\nPrincipais sinais de melhoria:")
     for idx, item in enumerate(maiores_melhoras, start=1):
         if item["delta_temporal"] >= 0:
             break
-        print(
-            f"  {idx}. {item['label_texto']} ({item['nome_dimensao']}) - delta {item['delta_temporal']:.2f}"
+        logger.info(
+            "  %d. %s (%s) - delta %.2f", idx, item["label_texto"], item["nome_dimensao"], item["delta_temporal"]
         )
 
-    print("\n" + "=" * 86)
+    logger.info("\n%s", "=" * 86)
 
 
 # --------------------------------------------------------------------------- #
@@ -861,12 +1036,12 @@ def main() -> None:
     try:
         caminho = gerar_grafico_dispersao_temporal_ampliado()
         if caminho:
-            print("\n>> Grafico de dispersao temporal ampliado gerado com sucesso.")
-            print(f">> Arquivo de saida: {caminho}")
+            logger.info("\n>> Grafico de dispersao temporal ampliado gerado com sucesso.")
+            logger.info(">> Arquivo de saida: %s", caminho)
         else:
-            print("!! Falha ao gerar o grafico ampliado.")
+            logger.error("!! Falha ao gerar o grafico ampliado.")
     except Exception as exc:  # pragma: no cover - log de erro
-        print(f"!! Erro ao executar a analise ampliada: {exc}")
+        logger.error("!! Erro ao executar a analise ampliada: %s", exc)
         import traceback
 
         traceback.print_exc()
@@ -6,16 +6,21 @@ de todas as dimensoes para o capitulo de interconexao de riscos.
 
 from __future__ import annotations
 
+import re
 import sys
 import unicodedata
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import List, Tuple
 
+import matplotlib
+matplotlib.use("Agg")  # geracao apenas de arquivos PNG, sem interface grafica
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
-from analise_likert_riscos import AnalisadorRiscosLikert
+from _cache_dados import obter_analisador, obter_mapeamento
+from _publicacao import PNG_PIL_KWARGS
 
 # Configuracao de cores por dimensao
 CORES_DIMENSAO = {
@@ -35,8 +40,25 @@ NOMES_DIMENSAO = {
     "Tecnologica": "Tecnológica",
 }
 
+# Niveis da escala Likert (1 a 5)
+NIVEIS_LIKERT = np.arange(1, 6, dtype=float)
+
+# Numero e descricao da variavel, sem o periodo entre colchetes
+_LABEL_RE = re.compile(r'^(\d+\.\d+)\s*(.+?)\s*\[.*?\]$')
+
+# Acentos do portugues mapeados direto para a letra base
+_FOLD = str.maketrans(
+    "áàâãäéèêëíïóôõöúüçÁÀÂÃÄÉÈÊËÍÏÓÔÕÖÚÜÇ",
+    "aaaaaeeeeiioooouucAAAAAEEEEIIOOOOUUC",
+)
+
+@lru_cache(maxsize=512)
 def ascii_safe(texto: str) -> str:
     """Remove acentuacao para evitar erros em consoles Windows."""
+    texto = texto.translate(_FOLD)
+    if texto.isascii():
+        return texto
+    # Outros caracteres acentuados: decomposicao NFKD completa
     return "".join(
         caractere
         for caractere in unicodedata.normalize("NFKD", texto)
@@ -53,7 +75,7 @@ def extrair_numero_variavel(nome_variavel: str) -> str:
 def gerar_label_sucinto_interconexao(nome_variavel: str) -> str:
     """Gera rotulo sucinto para o grafico de interconexao."""
     # Extrair número e descrição
-    match = nome_variavel.match(r'^(\d+\.\d+)\s*(.+?)\s*\[.*?\]$', nome_variavel)
+    match = _LABEL_RE.match(nome_variavel)
     if match:
         numero = match.group(1)
         descricao_completa = match.group(2).strip()
@@ -65,13 +87,14 @@ def gerar_label_sucinto_interconexao(nome_variavel: str) -> str:
         else:
             # Manter palavras-chave importantes
             palavras_chave = []
+            comprimento = 0  # len(' '.join(palavras_chave)), mantido incrementalmente
             for palavra in palavras:
-                if len(' '.join(palavras_chave + [palavra])) <= 55:
-                    palavras_chave.append(palavra)
-                elif palavra.lower() in ['crise', 'risco', 'impacto', 'consequência', 'contaminação', 'disrupção']:
-                    palavras_chave.append(palavra)
-                elif len(palavra) > 8:  # Palavras longas podem ser importantes
+                acrescimo = len(palavra) + (1 if palavras_chave else 0)
+                if (comprimento + acrescimo <= 55
+                        or palavra.lower() in ['crise', 'risco', 'impacto', 'consequência', 'contaminação', 'disrupção']
+                        or len(palavra) > 8):  # Palavras longas podem ser importantes
                     palavras_chave.append(palavra)
+                    comprimento += acrescimo
             
             sucinto = ' '.join(palavras_chave)
             if len(palavras) > len(palavras_chave):
@@ -81,6 +104,47 @@ def gerar_label_sucinto_interconexao(nome_variavel: str) -> str:
     
     return nome_variavel
 
+def calcular_estatisticas_risco_alto(dados: pd.DataFrame, colunas: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula percentual de respostas 4-5 e mediana de várias colunas Likert de uma vez.
+    
+    Mesmas definições de analisar_frequencias_likert (respostas não numéricas são
+    descartadas); colunas sem respostas numéricas resultam em NaN. A mediana sai do
+    histograma dos níveis 1-5 (contagem acumulada, sem ordenação); colunas com
+    valores fora da escala recaem em np.nanmedian.
+    
+    Args:
+        dados: DataFrame com as respostas brutas
+        colunas: Colunas a analisar
+        
+    Returns:
+        Tupla (percentual_risco_alto, mediana), arrays alinhados a `colunas`
+    """
+    bloco = dados[colunas].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    
+    # Histograma por coluna: contagens[nivel - 1, coluna]
+    contagens = (bloco[np.newaxis, :, :] == NIVEIS_LIKERT[:, np.newaxis, np.newaxis]).sum(axis=1)
+    totais = (~np.isnan(bloco)).sum(axis=0)
+    altos = contagens[3] + contagens[4]
+    com_respostas = totais > 0
+    
+    percentuais = np.full(len(colunas), np.nan)
+    medianas = np.full(len(colunas), np.nan)
+    percentuais[com_respostas] = (altos[com_respostas] / totais[com_respostas]) * 100
+    
+    # Mediana = média dos elementos centrais (posições (n-1)//2 e n//2 da amostra ordenada);
+    # o valor em cada posição é o primeiro nível cuja contagem acumulada a ultrapassa
+    acumulado = np.cumsum(contagens, axis=0)
+    inferior = (acumulado <= (totais - 1) // 2).sum(axis=0) + 1
+    superior = (acumulado <= totais // 2).sum(axis=0) + 1
+    na_escala = com_respostas & (acumulado[-1] == totais)
+    medianas[na_escala] = (inferior[na_escala] + superior[na_escala]) / 2
+    
+    fora_escala = com_respostas & ~na_escala
+    if fora_escala.any():
+        medianas[fora_escala] = np.nanmedian(bloco[:, fora_escala], axis=0)
+    return percentuais, medianas
+
 def gerar_grafico_interconexao_riscos() -> Path:
     """
     Gera grafico consolidado com os maiores riscos imediatos de todas as dimensoes.
@@ -90,13 +154,13 @@ def gerar_grafico_interconexao_riscos() -> Path:
     """
     print("Gerando gráfico de interconexão de riscos...")
     
-    # Inicializar analisador
-    analisador = AnalisadorRiscosLikert()
-    analisador.carregar_dados()
-    mapeamento = analisador.mapear_variaveis_por_dimensao()
+    # Analisador e mapeamento compartilhados (carregados uma vez por processo)
+    analisador = obter_analisador()
+    mapeamento = obter_mapeamento()
     
-    # Coletar todos os riscos do período imediato_2025
-    todos_riscos = []
+    # Coletar as variáveis do período imediato_2025 de todas as dimensões
+    colunas = []
+    dimensoes_colunas = []
     
     for dimensao, periodos in mapeamento.items():
         print(f"Processando dimensão: {ascii_safe(dimensao)}")
@@ -106,49 +170,49 @@ def gerar_grafico_interconexao_riscos() -> Path:
         for variavel in variaveis_periodo:
             if variavel not in analisador.dados_brutos:
                 continue
-            
-            serie = analisador.dados_brutos[variavel]
-            estatisticas = analisador.analisar_frequencias_likert(serie)
-            
-            if not estatisticas:
-                continue
-            
-            # Gerar label sucinto
-            label_completo = analisador.gerar_label_sucinto(variavel, incluir_numero=False)
-            label_sucinto = ascii_safe(label_completo)
-            
-            # Limitar tamanho do label para o gráfico
-            if len(label_sucinto) > 80:
-                label_sucinto = label_sucinto[:77] + "..."
-            
-            todos_riscos.append({
-                'variavel': variavel,
-                'label': label_sucinto,
-                'dimensao': dimensao,
-                'percentual_risco_alto': estatisticas['percentual_risco_alto'],
-                'mediana': estatisticas['mediana'],
-                'cor': CORES_DIMENSAO[dimensao],
-                'nome_dimensao': NOMES_DIMENSAO[dimensao]
-            })
-    
-    if not todos_riscos:
+            colunas.append(variavel)
+            dimensoes_colunas.append(dimensao)
+    
+    # Estatísticas de todas as variáveis em uma única passada vetorizada
+    percentuais, medianas = calcular_estatisticas_risco_alto(analisador.dados_brutos, colunas)
+    
+    # Descarta de uma vez as variáveis sem respostas numéricas
+    validas = ~np.isnan(percentuais)
+    if not validas.any():
         print("Nenhum risco encontrado para análise.")
         return None
     
-    # Ordenar por percentual de risco alto (maior primeiro)
-    todos_riscos.sort(key=lambda x: x['percentual_risco_alto'], reverse=True)
+    todos_riscos = pd.DataFrame({
+        'variavel': np.asarray(colunas, dtype=object)[validas],
+        'dimensao': np.asarray(dimensoes_colunas, dtype=object)[validas],
+        'percentual_risco_alto': percentuais[validas],
+        'mediana': medianas[validas],
+    })
+    
+    # Labels sucintos, limitados em tamanho para o gráfico
+    labels_riscos = []
+    for variavel in todos_riscos['variavel']:
+        label_sucinto = ascii_safe(analisador.gerar_label_sucinto(variavel, incluir_numero=False))
+        if len(label_sucinto) > 80:
+            label_sucinto = label_sucinto[:77] + "..."
+        labels_riscos.append(label_sucinto)
+    todos_riscos.insert(1, 'label', labels_riscos)
+    todos_riscos['cor'] = todos_riscos['dimensao'].map(CORES_DIMENSAO)
+    todos_riscos['nome_dimensao'] = todos_riscos['dimensao'].map(NOMES_DIMENSAO)
     
-    # Limitar ao top 20 para melhor visualização
-    top_riscos = todos_riscos[:20]
+    # Top 20 por percentual de risco alto (maior primeiro);
+    # empates mantêm a ordem original, como em sorted(..., reverse=True)[:20]
+    top_riscos = todos_riscos.nlargest(20, 'percentual_risco_alto', keep='first').reset_index(drop=True)
     
     print(f"Total de riscos analisados: {len(todos_riscos)}")
     print(f"Top 20 riscos selecionados para visualização")
     
-    # Preparar dados para o gráfico
-    labels = [risco['label'] for risco in top_riscos][::-1]  # Inverter para barras horizontais
-    valores = np.array([risco['percentual_risco_alto'] for risco in top_riscos][::-1])
-    cores = [risco['cor'] for risco in top_riscos][::-1]
-    medianas = [risco['mediana'] for risco in top_riscos][::-1]
+    # Preparar dados para o gráfico (invertidos para barras horizontais)
+    invertidos = top_riscos.iloc[::-1]
+    labels = invertidos['label'].tolist()
+    valores = invertidos['percentual_risco_alto'].to_numpy()
+    cores = invertidos['cor'].tolist()
+    medianas = invertidos['mediana'].tolist()
     
     # Criar gráfico
     altura = max(8.0, 0.35 * len(labels))
@@ -189,8 +253,9 @@ def gerar_grafico_interconexao_riscos() -> Path:
     
     # Legenda de cores por dimensão
     legend_elements = []
+    dimensoes_top = set(top_riscos['dimensao'])
     for dimensao, cor in CORES_DIMENSAO.items():
-        if dimensao in [risco['dimensao'] for risco in top_riscos]:
+        if dimensao in dimensoes_top:
             legend_elements.append(
                 plt.Rectangle((0, 0), 1, 1, facecolor=cor, 
                            label=NOMES_DIMENSAO[dimensao], alpha=0.8)
@@ -215,7 +280,7 @@ def gerar_grafico_interconexao_riscos() -> Path:
     caminho_saida = Path("quarto/assets/graficos_agrupados/grafico_interconexao_riscos_imediato_2025.png")
     caminho_saida.parent.mkdir(parents=True, exist_ok=True)
     
-    plt.savefig(caminho_saida, dpi=300, bbox_inches='tight', facecolor='white')
+    plt.savefig(caminho_saida, dpi=300, bbox_inches='tight', facecolor='white', pil_kwargs=PNG_PIL_KWARGS)
     plt.close()
     
     print(f"Gráfico salvo em: {caminho_saida}")
@@ -225,60 +290,50 @@ def gerar_grafico_interconexao_riscos() -> Path:
     
     return caminho_saida
 
-def gerar_analise_estatistica(top_riscos: List[Dict], media_geral: float):
+def gerar_analise_estatistica(top_riscos: pd.DataFrame, media_geral: float):
     """
     Gera análise estatística dos top riscos para inclusão no relatório.
     
     Args:
-        top_riscos: Lista com os top riscos analisados
+        top_riscos: DataFrame com os top riscos analisados (uma linha por risco)
         media_geral: Média geral de percentuais
     """
     print("\n" + "="*60)
     print("ANÁLISE ESTATÍSTICA - TOP RISCOS IMEDIATOS")
     print("="*60)
     
-    # Análise por dimensão
-    analise_dimensoes = {}
-    for risco in top_riscos:
-        dimensao = risco['dimensao']
-        if dimensao not in analise_dimensoes:
-            analise_dimensoes[dimensao] = {
-                'count': 0,
-                'soma': 0,
-                'max': 0,
-                'riscos': []
-            }
-        
-        analise_dimensoes[dimensao]['count'] += 1
-        analise_dimensoes[dimensao]['soma'] += risco['percentual_risco_alto']
-        analise_dimensoes[dimensao]['riscos'].append(risco)
-        
-        if risco['percentual_risco_alto'] > analise_dimensoes[dimensao]['max']:
-            analise_dimensoes[dimensao]['max'] = risco['percentual_risco_alto']
+    # Análise por dimensão (na ordem em que cada dimensão aparece no ranking)
+    analise_dimensoes = (top_riscos.groupby('dimensao', sort=False)['percentual_risco_alto']
+                         .agg(['count', 'mean', 'max']))
+    
+    # Top 3 de cada dimensão (ordenação estável: empates mantêm a ordem do ranking)
+    top3_dimensoes = (top_riscos.sort_values('percentual_risco_alto', ascending=False, kind='stable')
+                      .groupby('dimensao', sort=False).head(3))
     
     print(f"Média geral de risco alto: {media_geral:.1f}%")
     print(f"Total de riscos analisados: {len(top_riscos)}")
     print(f"\nAnálise por Dimensão:")
     print("-" * 40)
     
-    for dimensao, dados in analise_dimensoes.items():
-        media_dimensao = dados['soma'] / dados['count']
+    for dimensao, dados in analise_dimensoes.iterrows():
         print(f"\n{NOMES_DIMENSAO[dimensao]}:")
-        print(f"  Quantidade: {dados['count']} riscos")
-        print(f"  Média: {media_dimensao:.1f}%")
+        print(f"  Quantidade: {int(dados['count'])} riscos")
+        print(f"  Média: {dados['mean']:.1f}%")
         print(f"  Máximo: {dados['max']:.1f}%")
         print(f"  Top 3:")
         
-        # Ordenar riscos da dimensão
-        riscos_dimensao = sorted(dados['riscos'], key=lambda x: x['percentual_risco_alto'], reverse=True)
-        for i, risco in enumerate(riscos_dimensao[:3], 1):
-            print(f"    {i}. {risco['label']}: {risco['percentual_risco_alto']:.1f}%")
+        riscos_dimensao = top3_dimensoes[top3_dimensoes['dimensao'] == dimensao]
+        for i, (label, percentual) in enumerate(
+                zip(riscos_dimensao['label'], riscos_dimensao['percentual_risco_alto']), 1):
+            print(f"    {i}. {label}: {percentual:.1f}%")
     
     # Riscos críticos (>40%)
-    riscos_criticos = [r for r in top_riscos if r['percentual_risco_alto'] > 40]
+    riscos_criticos = top_riscos[top_riscos['percentual_risco_alto'] > 40]
     print(f"\nRISCOS CRÍTICOS (>40%): {len(riscos_criticos)}")
-    for i, risco in enumerate(riscos_criticos, 1):
-        print(f"  {i}. {risco['label']} ({risco['nome_dimensao']}): {risco['percentual_risco_alto']:.1f}%")
+    for i, (label, nome_dimensao, percentual) in enumerate(zip(
+            riscos_criticos['label'], riscos_criticos['nome_dimensao'],
+            riscos_criticos['percentual_risco_alto']), 1):
+        print(f"  {i}. {label} ({nome_dimensao}): {percentual:.1f}%")
     
     print("\n" + "="*60)
 
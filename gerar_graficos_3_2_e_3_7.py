@@ -5,25 +5,48 @@ Script para gerar gráficos agrupados temporais para variáveis 3.2 e 3.7
 
 import sys
 import os
-import shutil
+import io
+from contextlib import redirect_stdout
+from pathlib import Path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+import matplotlib
+matplotlib.use("Agg")  # renderização só em arquivo, sem backend gráfico
+import matplotlib.pyplot as plt
+
 from analise_likert_riscos import AnalisadorRiscosLikert
+from _cache_planilhas import ler_excel_com_cache
+from _publicacao import publicar_grafico
 import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
-def carregar_dados_temp():
-    """Carregar dados do arquivo temporário"""
+ARQUIVO_DADOS_TEMP = Path("questionario_temp.xlsx")
+
+def carregar_dados_temp(colunas=None):
+    """
+    Carregar dados do arquivo temporário
+    
+    Usa a cópia em pickle de ler_excel_com_cache (uma por seleção de colunas),
+    refeita apenas quando o arquivo Excel muda.
+    
+    Args:
+        colunas: Índices (posição na planilha) das colunas a ler; None lê todas
+        
+    Returns:
+        DataFrame com os dados (colunas na ordem da planilha) ou None se erro
+    """
     try:
-        df = pd.read_excel("questionario_temp.xlsx")
-        return df
+        if colunas is not None:
+            colunas = sorted(colunas)
+        return ler_excel_com_cache(ARQUIVO_DADOS_TEMP, usecols=colunas)
     except Exception as e:
         logger.error(f"Erro ao carregar dados temporários: {e}")
         return None
 
-def criar_grafico_agrupado_temporal(df, variavel, indices_periodos, output_dir='outputs', nome_arquivo=None):
+def criar_grafico_agrupado_temporal(df, variavel, indices_periodos, caminhos_saida, ax=None,
+                                    colunas_lidas=None):
     """
     Função personalizada para criar gráfico agrupado temporal usando índices exatos
     
@@ -31,13 +54,22 @@ def criar_grafico_agrupado_temporal(df, variavel, indices_periodos, output_dir='
         df: DataFrame com os dados
         variavel: Código da variável (ex: '3.2')
         indices_periodos: Dicionário com mapeamento período -> índice da coluna
-        output_dir: Diretório para salvar o gráfico
-        nome_arquivo: Nome do arquivo (opcional)
+        caminhos_saida: Caminhos do PNG; o gráfico é renderizado no primeiro e
+            publicado nos demais (ver publicar_grafico)
+        ax: Eixo reaproveitado entre variáveis (opcional)
+        colunas_lidas: Índices na planilha das colunas de df, quando carregado
+            só com parte das colunas (ver carregar_dados_temp); None se df tem todas
         
     Returns:
         True se sucesso, False se erro
     """
     try:
+        # Índice na planilha -> posição da coluna em df
+        if colunas_lidas is None:
+            posicoes = range(len(df.columns))
+        else:
+            posicoes = {indice: posicao for posicao, indice in enumerate(sorted(colunas_lidas))}
+        
         # Criar analisador temporário
         analisador = AnalisadorRiscosLikert()
         analisador.dados_brutos = df
@@ -46,8 +78,8 @@ def criar_grafico_agrupado_temporal(df, variavel, indices_periodos, output_dir='
         dados_periodos = {}
         
         for periodo, indice in indices_periodos.items():
-            if indice < len(df.columns):
-                coluna = df.columns[indice]
+            if indice in posicoes:
+                coluna = df.columns[posicoes[indice]]
                 dados_periodos[periodo] = df[coluna]
                 print(f"    Encontrado: {coluna[:50]}... -> {periodo} (índice {indice})")
             else:
@@ -66,35 +98,34 @@ def criar_grafico_agrupado_temporal(df, variavel, indices_periodos, output_dir='
         
         nome_titulo = titulos_limpos.get(variavel, f'Variável {variavel}')
         
-        # Gerar nome do arquivo se não fornecido
-        if nome_arquivo is None:
-            nome_arquivo = f'grafico_agrupado_{variavel.replace(".", "_")}_temporal.png'
-        
-        # Caminho completo
-        caminho_completo = os.path.join(output_dir, nome_arquivo)
-        
-        # Criar diretório se não existir
-        os.makedirs(output_dir, exist_ok=True)
+        # Renderizar uma única vez, no primeiro caminho
+        caminho_principal = caminhos_saida[0]
+        os.makedirs(os.path.dirname(caminho_principal), exist_ok=True)
         
         # Gerar gráfico usando o método da classe com título limpo
         sucesso = analisador.gerar_grafico_barras_agrupado_temporal(
-            dados_periodos, nome_titulo, caminho_completo
+            dados_periodos, nome_titulo, caminho_principal, ax=ax
         )
         
+        # Demais destinos apontam para o mesmo arquivo
+        if sucesso:
+            for destino in caminhos_saida[1:]:
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                publicar_grafico(caminho_principal, destino)
+        
         return sucesso
         
     except Exception as e:
         logger.error(f"Erro ao criar gráfico agrupado para {variavel}: {e}")
         return False
 
-def gerar_graficos_3_2_e_3_7():
-    """Gera gráficos agrupados para variáveis 3.2 e 3.7"""
+def gerar_graficos_3_2_e_3_7(manter_saida_teste=False):
+    """
+    Gera gráficos agrupados para variáveis 3.2 e 3.7
     
-    # Carregar dados
-    df = carregar_dados_temp()
-    if df is None:
-        print("Erro: Não foi possível carregar os dados")
-        return
+    Args:
+        manter_saida_teste: Também publica cada PNG em outputs/teste
+    """
     
     # Mapeamento exato de índices baseado na análise anterior
     # Variável 3.2: Índices 123, 124, 125
@@ -112,39 +143,55 @@ def gerar_graficos_3_2_e_3_7():
         }
     }
     
+    # Carregar dados (somente as colunas usadas pelas variáveis)
+    colunas_lidas = sorted({indice for indices in variaveis_indices.values() for indice in indices.values()})
+    df = carregar_dados_temp(colunas_lidas)
+    if df is None:
+        print("Erro: Não foi possível carregar os dados")
+        return
+    
     print("Gerando gráficos agrupados para variáveis 3.2 e 3.7...")
     
-    for var, indices in variaveis_indices.items():
-        print(f"\nProcessando variável {var}...")
-        
-        # Gerar gráfico
-        try:
-            sucesso = criar_grafico_agrupado_temporal(
-                df, var, indices,
-                output_dir='outputs/teste',
-                nome_arquivo=f'grafico_agrupado_{var.replace(".", "_")}_temporal.png'
-            )
+    # Uma única figura, limpa e redesenhada a cada variável
+    fig, ax = plt.subplots(figsize=(14, 8))
+    
+    # Mensagens acumuladas em memória e escritas de uma só vez no stdout ao final
+    saida = io.StringIO()
+    with redirect_stdout(saida):
+        for var, indices in variaveis_indices.items():
+            print(f"\nProcessando variável {var}...")
             
-            if sucesso:
-                print(f"  OK Gráfico {var} gerado com sucesso")
-                origem = f'outputs/teste/grafico_agrupado_{var.replace(".", "_")}_temporal.png'
-                destinos = [
-                    f'quarto/assets/graficos_agrupados/grafico_agrupado_{var.replace(".", "_")}_temporal.png',
-                    f'quarto/assets/geopoliticos/grafico_agrupado_{var.replace(".", "_")}_temporal.png',
-                ]
-                if os.path.exists(origem):
-                    for destino in destinos:
-                        os.makedirs(os.path.dirname(destino), exist_ok=True)
-                        shutil.copy2(origem, destino)
-                        print(f"  Copiado para {destino}")
-            else:
-                print(f"  ERRO: Falha ao gerar gráfico {var}")
+            nome_arquivo = f'grafico_agrupado_{var.replace(".", "_")}_temporal.png'
+            caminhos_saida = [
+                f'quarto/assets/graficos_agrupados/{nome_arquivo}',
+                f'quarto/assets/geopoliticos/{nome_arquivo}',
+            ]
+            if manter_saida_teste:
+                caminhos_saida.append(f'outputs/teste/{nome_arquivo}')
+            
+            # Gerar gráfico
+            try:
+                sucesso = criar_grafico_agrupado_temporal(
+                    df, var, indices, caminhos_saida, ax=ax, colunas_lidas=colunas_lidas
+                )
                 
-        except Exception as e:
-            print(f"  ERRO: Exceção ao processar variável {var}: {str(e)}")
+                if sucesso:
+                    print(f"  OK Gráfico {var} gerado com sucesso")
+                    for caminho in caminhos_saida:
+                        print(f"  Salvo em {caminho}")
+                else:
+                    print(f"  ERRO: Falha ao gerar gráfico {var}")
+                    
+            except Exception as e:
+                print(f"  ERRO: Exceção ao processar variável {var}: {str(e)}")
+        
+        print("\nProcessamento concluído!")
+        print(f"Total de variáveis processadas: {len(variaveis_indices)}")
+    
+    plt.close(fig)
     
-    print("\nProcessamento concluído!")
-    print(f"Total de variáveis processadas: {len(variaveis_indices)}")
+    sys.stdout.write(saida.getvalue())
+    sys.stdout.flush()
 
 if __name__ == "__main__":
     gerar_graficos_3_2_e_3_7()
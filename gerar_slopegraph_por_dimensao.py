@@ -2,14 +2,25 @@
 # -*- coding: utf-8 -*-
 # Gera slopegraphs individuais para cada dimensão de risco
 
+import io
+import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from textwrap import shorten
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # somente gera PNGs; processos filhos não iniciam backend gráfico
 import matplotlib.pyplot as plt
 from matplotlib import cm
+from matplotlib.collections import LineCollection
+
+from _publicacao import PNG_PIL_KWARGS
+from _cache_planilhas import ler_excel_com_cache
 
 # --- CONFIG ---
 INPUT_XLSX = "questionario.xlsx"
@@ -51,14 +62,23 @@ DIMENSOES = {
     }
 }
 
+# Padrões usados por clean_base (compilados uma única vez)
+_RE_COLCHETES = re.compile(r'\s*\[.*?\]\s*')
+_RE_PREFIXO_TRACO = re.compile(r'^\s*\d+(?:\.\d+)*\s*-\s*')
+_RE_PREFIXO = re.compile(r'^\s*\d+(?:\.\d+)*\s*')
+_RE_ESPACOS = re.compile(r'\s+')
+
+# Eixo de desenho de cada processo do pool (definido em _inicializar_processo)
+_eixo_processo = None
+
 # --- Funções utilitárias ---
 
 def clean_base(colname: str) -> str:
     """Remove sufixo [horizonte], prefixos numéricos '4.1- ' ou '4.1 ', normaliza espaços."""
-    base = re.sub(r'\s*\[.*?\]\s*', '', colname)
-    base = re.sub(r'^\s*\d+(?:\.\d+)*\s*-\s*', '', base)
-    base = re.sub(r'^\s*\d+(?:\.\d+)*\s*', '', base)
-    return re.sub(r'\s+', ' ', base).strip()
+    base = _RE_COLCHETES.sub('', colname)
+    base = _RE_PREFIXO_TRACO.sub('', base)
+    base = _RE_PREFIXO.sub('', base)
+    return _RE_ESPACOS.sub(' ', base).strip()
 
 def short_label(s: str, width=70) -> str:
     return shorten(s, width=width, placeholder="…")
@@ -75,20 +95,21 @@ def _spread_positions(y_vals, gap):
     """
     Espalha valores y para garantir um gap mínimo entre vizinhos.
     Faz uma passada para frente (empurra para baixo) e outra para trás (puxa para cima).
+
+    Cada passada é um máximo/mínimo acumulado sobre y - i*gap (mesmo resultado do
+    laço elemento a elemento, executado em NumPy).
     """
-    y = np.array(y_vals, dtype=float).copy()
-    # para frente
-    for i in range(1, len(y)):
-        if y[i] - y[i-1] < gap:
-            y[i] = y[i-1] + gap
-    # para trás
-    for i in range(len(y)-2, -1, -1):
-        if y[i+1] - y[i] < gap:
-            y[i] = y[i+1] - gap
+    y = np.array(y_vals, dtype=float)
+    offsets = np.arange(len(y)) * gap
+    # para frente: y[i] = max(y[i], y[i-1] + gap)
+    y = np.maximum.accumulate(y - offsets) + offsets
+    # para trás: y[i] = min(y[i], y[i+1] - gap)
+    y = np.minimum.accumulate((y - offsets)[::-1])[::-1] + offsets
     return y
 
-def gerar_slopegraph_dimensao(dados_dimensao: pd.DataFrame, nome_dimensao: str, cor_dimensao: str) -> Path:
-    """Gera slopegraph para uma dimensão específica."""
+def gerar_slopegraph_dimensao(dados_dimensao: pd.DataFrame, nome_dimensao: str, cor_dimensao: str,
+                              ax=None) -> Path:
+    """Gera slopegraph para uma dimensão específica (em `ax`, se fornecido, reaproveitando a figura)."""
     if dados_dimensao.empty:
         print(f"Sem dados para a dimensão {nome_dimensao}")
         return None
@@ -107,31 +128,52 @@ def gerar_slopegraph_dimensao(dados_dimensao: pd.DataFrame, nome_dimensao: str,
     subset["y_mid"] = _spread_positions(subset["y_mid"].to_numpy(), MIN_GAP)
 
     # Plot (tamanho dinâmico baseado no número de variáveis) - mais alto por variável
-    fig, ax = plt.subplots(figsize=(13, max(7, 0.50 * len(subset))))
+    altura = max(7, 0.50 * len(subset))
+    fechar_figura = ax is None
+    if fechar_figura:
+        fig, ax = plt.subplots(figsize=(13, altura))
+    else:
+        # Figura reaproveitada: limpa o eixo e volta às margens padrão antes do tight_layout
+        fig = ax.figure
+        ax.clear()
+        fig.set_size_inches(13, altura)
+        fig.subplots_adjust(**{margem: plt.rcParams[f'figure.subplot.{margem}']
+                               for margem in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
     x_left, x_center, x_right = 0.0, 0.5, 1.0
 
     # Paleta com cores para variáveis individuais
     cmap = plt.get_cmap('Dark2', max(8, len(subset)))
 
-    for i, (_, r) in enumerate(subset.iterrows()):
-        color = cmap(i % cmap.N)
-        y0, y1, ym = r["curto_mean"], r["longo_mean"], r["y_mid"]
-
-        # pontos
-        ax.plot([x_left],  [y0], marker='o', color=color)
-        ax.plot([x_right], [y1], marker='o', color=color)
-
-        # conectores com maior abertura no centro
-        ax.plot([x_left,  x_center - GAP_X], [y0, ym], linewidth=1.6, color=color)
-        ax.plot([x_right, x_center + GAP_X], [y1, ym], linewidth=1.6, color=color)
+    # Colunas extraídas uma única vez
+    y0s = subset["curto_mean"].to_numpy()
+    y1s = subset["longo_mean"].to_numpy()
+    yms = subset["y_mid"].to_numpy()
+    colors = [cmap(i % cmap.N) for i in range(len(subset))]
+
+    # conectores com maior abertura no centro: uma única coleção para todas as variáveis
+    segmentos = [
+        [[(x_left, y0), (x_center - GAP_X, ym)], [(x_right, y1), (x_center + GAP_X, ym)]]
+        for y0, y1, ym in zip(y0s, y1s, yms)
+    ]
+    ax.add_collection(LineCollection(
+        [segmento for par in segmentos for segmento in par],
+        colors=[color for color in colors for _ in range(2)], linewidths=1.6, zorder=2
+    ))
+
+    # pontos das duas janelas em um único scatter
+    ax.scatter(
+        np.r_[np.full(len(y0s), x_left), np.full(len(y1s), x_right)], np.r_[y0s, y1s],
+        s=plt.rcParams['lines.markersize'] ** 2, c=colors + colors, zorder=2
+    )
 
+    for y0, y1, ym, label, color in zip(y0s, y1s, yms, subset["label"].to_numpy(), colors):
         # valores numéricos
         ax.text(x_left - 0.02,  y0, f"{y0:.2f}", ha='right', va='center', fontsize=8, color=color)
         ax.text(x_right + 0.02, y1, f"{y1:.2f}", ha='left',  va='center', fontsize=8, color=color)
 
         # rótulo central com padding ligeiramente maior
         ax.text(
-            x_center, ym, r["label"], ha='center', va='center', fontsize=8, color=color,
+            x_center, ym, label, ha='center', va='center', fontsize=8, color=color,
             bbox=dict(boxstyle='round,pad=0.25', fc='white', ec=color, alpha=0.75, lw=0.6)
         )
 
@@ -150,26 +192,44 @@ def gerar_slopegraph_dimensao(dados_dimensao: pd.DataFrame, nome_dimensao: str,
     # Linha vertical central sutil
     ax.axvline(x=x_center, color='gray', linestyle=':', alpha=0.3, linewidth=1)
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     # Salvar
     output_file = Path(OUTPUT_DIR) / f"slopegraph_{nome_dimensao.lower().replace('ê', 'e').replace('á', 'a').replace('ó', 'o')}.png"
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white', pil_kwargs=PNG_PIL_KWARGS)
+    if fechar_figura:
+        plt.close(fig)
 
     print(f"Gráfico salvo: {output_file}")
     return output_file
 
+def _inicializar_processo():
+    """Cria uma única figura por processo, limpa e redesenhada a cada dimensão."""
+    global _eixo_processo
+    _, _eixo_processo = plt.subplots(figsize=(13, 7))
+
+def _gerar_dimensao_processo(tarefa):
+    """
+    Gera o slopegraph de uma dimensão dentro de um processo do pool.
+
+    Retorna o arquivo gerado (ou None) e as mensagens impressas, repassadas ao
+    processo principal para manter a ordem original da saída.
+    """
+    dados_dimensao, nome_dimensao, cor_dimensao = tarefa
+    saida = io.StringIO()
+    with redirect_stdout(saida):
+        arquivo = gerar_slopegraph_dimensao(dados_dimensao, nome_dimensao, cor_dimensao, ax=_eixo_processo)
+    return arquivo, saida.getvalue()
+
 # --- Carregar e preparar dados ---
 
 def main():
     """Função principal."""
     print("=== GERANDO SLOPEGRAPHS POR DIMENSÃO ===")
 
-    # Carregar dados
-    xls = pd.ExcelFile(INPUT_XLSX)
-    df = pd.read_excel(INPUT_XLSX, sheet_name=xls.sheet_names[0])
+    # Carregar dados (primeira planilha, via cópia em pickle quando atualizada)
+    df = ler_excel_com_cache(INPUT_XLSX)
 
     # Normaliza placeholders
     df = df.replace({'-': np.nan, '–': np.nan})
@@ -185,23 +245,31 @@ def main():
     # Apenas variáveis presentes nas duas janelas
     common_vars = sorted(set(curto_map.values()).intersection(set(longo_map.values())))
 
-    # Calcula médias por variável
-    rows = []
-    for var in common_vars:
-        curto_col = next(k for k, v in curto_map.items() if v == var)
-        longo_col = next(k for k, v in longo_map.items() if v == var)
-        curto_mean = pd.to_numeric(df[curto_col], errors='coerce').mean()
-        longo_mean = pd.to_numeric(df[longo_col], errors='coerce').mean()
-
-        # Identifica a dimensão usando o nome original da coluna (com prefixo)
-        dimensao = identificar_dimensao(curto_col)
-
-        rows.append({
+    # Coluna original (primeira ocorrência) de cada nome-base
+    curto_por_var = {}
+    for k, v in curto_map.items():
+        curto_por_var.setdefault(v, k)
+    longo_por_var = {}
+    for k, v in longo_map.items():
+        longo_por_var.setdefault(v, k)
+    curto_sel = [curto_por_var[var] for var in common_vars]
+    longo_sel = [longo_por_var[var] for var in common_vars]
+
+    # Calcula médias de todas as variáveis de uma vez
+    curto_means = df[curto_sel].apply(pd.to_numeric, errors='coerce').mean().to_numpy()
+    longo_means = df[longo_sel].apply(pd.to_numeric, errors='coerce').mean().to_numpy()
+
+    # Identifica a dimensão usando o nome original da coluna (com prefixo)
+    rows = [
+        {
             "variavel": var,
             "curto_mean": curto_mean,
             "longo_mean": longo_mean,
-            "dimensao": dimensao
-        })
+            "dimensao": identificar_dimensao(curto_col)
+        }
+        for var, curto_col, curto_mean, longo_mean
+        in zip(common_vars, curto_sel, curto_means, longo_means)
+    ]
 
     tidy = pd.DataFrame(rows).dropna(how="all", subset=["curto_mean", "longo_mean"])
     tidy["label"] = tidy["variavel"].apply(lambda s: short_label(s, LABEL_WIDTH))
@@ -212,19 +280,25 @@ def main():
         count = len(tidy[tidy["dimensao"] == dimensao])
         print(f"{dimensao}: {count} variáveis")
 
-    # Gera slopegraphs por dimensão
+    # Dimensões com variáveis, na ordem de DIMENSOES
+    tarefas = {}
+    for dimensao, config in DIMENSOES.items():
+        dados_dimensao = tidy[tidy["dimensao"] == dimensao].copy()
+        if not dados_dimensao.empty:
+            tarefas[dimensao] = (dados_dimensao, config["nome"], config["cor"])
+
+    # Cada dimensão é independente: renderiza em paralelo, um processo por núcleo
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_inicializar_processo) as executor:
+        resultados = dict(zip(tarefas, executor.map(_gerar_dimensao_processo, tarefas.values())))
+
     arquivos_gerados = []
     for dimensao, config in DIMENSOES.items():
         print(f"\n-- Processando dimensão: {config['nome']} (procurando: {dimensao})")
-        dados_dimensao = tidy[tidy["dimensao"] == dimensao].copy()
 
-        if not dados_dimensao.empty:
-            print(f"  Encontradas {len(dados_dimensao)} variáveis")
-            arquivo = gerar_slopegraph_dimensao(
-                dados_dimensao,
-                config["nome"],
-                config["cor"]
-            )
+        if dimensao in resultados:
+            print(f"  Encontradas {len(tarefas[dimensao][0])} variáveis")
+            arquivo, saida = resultados[dimensao]
+            sys.stdout.write(saida)
             if arquivo:
                 arquivos_gerados.append(arquivo)
         else:
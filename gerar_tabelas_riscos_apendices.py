@@ -12,8 +12,11 @@ from pathlib import Path
 from typing import Dict, List, Optional
 import re
 
+import numpy as np
 import pandas as pd
 
+from _cache_planilhas import ler_excel_com_cache
+
 # Mapeamento das regiões brasileiras por UF
 STATE_TO_REGION: Dict[str, str] = {
     "AC": "Norte",
@@ -45,6 +48,10 @@ STATE_TO_REGION: Dict[str, str] = {
     "TO": "Norte",
 }
 
+# Mesmo mapeamento como Series categórica: o map por Series alinha pelo índice
+# e já devolve a região com dtype category, pronta para o agrupamento
+STATE_TO_REGION_SERIES = pd.Series(STATE_TO_REGION, name="regiao", dtype="category")
+
 DIMENSION_BY_PREFIX = {
     "1": "Econômica",
     "2": "Ambiental",
@@ -54,6 +61,11 @@ DIMENSION_BY_PREFIX = {
 }
 
 IMMEDIATE_TAG = "Imediato (2025)"
+
+# Cabeçalho das variáveis de risco: '1.1 Descrição do risco. [Imediato (2025)]'
+RISK_COLUMN_RE = re.compile(r"^(?P<code>\d+\.\d+)\s+(?P<label>.+?)\s*\[(?P<periodo>.+?)\]\s*$")
+# Sigla da UF entre parênteses: 'Santa Catarina (SC)'
+UF_RE = re.compile(r"\(([A-Z]{2})\)")
 HTML_TABLE_CLASSES = ["table", "table-sm", "table-striped"]
 
 COLUMN_LABELS_PORTOS = {
@@ -90,8 +102,7 @@ def extract_risk_metadata(column_name: str) -> Optional[RiskColumn]:
     Extrai código, descrição resumida, período e dimensão a partir do nome da coluna.
     Espera colunas no formato '1.1 Descrição do risco. [Imediato (2025)]'.
     """
-    pattern = r"^(?P<code>\d+\.\d+)\s+(?P<label>.+?)\s*\[(?P<periodo>.+?)\]\s*$"
-    match = re.match(pattern, column_name.strip())
+    match = RISK_COLUMN_RE.match(column_name.strip())
     if not match:
         return None
 
@@ -102,35 +113,16 @@ def extract_risk_metadata(column_name: str) -> Optional[RiskColumn]:
     return RiskColumn(code=code, label=label, period=period, dimension=dimension)
 
 
-def normalize_uf(value: object) -> Optional[str]:
-    """Extrai a sigla da UF de strings como 'Santa Catarina (SC)'."""
-    if not isinstance(value, str):
-        return None
-    value = value.strip()
-    if len(value) == 2 and value.isalpha():
-        return value.upper()
-
-    match = re.search(r"\(([A-Z]{2})\)", value)
-    if match:
-        return match.group(1)
-    return None
-
-
-def percentage_high_risk(series: pd.Series) -> tuple[float, int, float]:
+def normalize_uf(values: pd.Series) -> pd.Series:
     """
-    Calcula o percentual de respostas em níveis 4-5.
-
-    Returns:
-        (percentual, total_respostas_validas, media_likert)
+    Extrai a sigla da UF de strings como 'Santa Catarina (SC)' ou 'SC'.
+    Valores que não são texto, ou sem sigla reconhecível, resultam em NA.
     """
-    numeric = pd.to_numeric(series, errors="coerce").dropna()
-    total = int(numeric.count())
-    if total == 0:
-        return (0.0, 0, float("nan"))
-
-    pct = float(((numeric >= 4).sum() / total) * 100.0)
-    media = float(numeric.mean())
-    return (pct, total, media)
+    # Converte para o dtype "string" antes do acessor .str, que falha em colunas sem
+    # texto (numéricas ou só com NaN); números nunca formam uma sigla
+    texto = values.astype("string").str.strip()
+    sigla_simples = (texto.str.len() == 2) & texto.str.isalpha().fillna(False).astype(bool)
+    return texto.str.upper().where(sigla_simples).fillna(texto.str.extract(UF_RE, expand=False))
 
 
 def format_value(value: object) -> str:
@@ -147,10 +139,9 @@ def dataframe_to_markdown(df: pd.DataFrame) -> str:
     headers = [str(col) for col in df.columns]
     header_line = "| " + " | ".join(headers) + " |"
     separator = "| " + " | ".join(["---"] * len(headers)) + " |"
-    rows = []
-    for _, row in df.iterrows():
-        values = [format_value(valor) for valor in row]
-        rows.append("| " + " | ".join(values) + " |")
+    # Formata coluna a coluna (sem criar uma Series por linha) e monta as linhas por zip
+    colunas = [[format_value(valor) for valor in serie.tolist()] for _, serie in df.items()]
+    rows = ["| " + " | ".join(values) + " |" for values in zip(*colunas)]
     return "\n".join([header_line, separator, *rows]) + "\n"
 
 
@@ -172,32 +163,59 @@ def compute_group_table(
 ) -> pd.DataFrame:
     """Calcula métricas de risco para cada grupo informado."""
 
-    registros: List[Dict[str, object]] = []
-    for valor_grupo, subdf in df.groupby(group_col):
-        if pd.isna(valor_grupo):
-            continue
-        valor_formatado = str(valor_grupo).strip()
-        for col, meta in risk_columns.items():
-            pct, total, media = percentage_high_risk(subdf[col])
-            if total == 0:
-                continue
-            registros.append(
-                {
-                    group_label: valor_formatado,
-                    "codigo": meta.code,
-                    "dimensao": meta.dimension,
-                    "risco": meta.label,
-                    "periodo": meta.period,
-                    "percentual_risco_alto": round(pct, 2),
-                    "media_likert": round(media, 2),
-                    "respostas_validas": total,
-                }
-            )
-
-    if not registros:
-        return pd.DataFrame()
+    # Todas as colunas de risco convertidas de uma vez. Notas Likert (1 a 5) são
+    # exatas em float32, assim como as contagens e somas por grupo
+    colunas = list(risk_columns)
+    valores = df[colunas].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float32)
+    # Chave de agrupamento categórica: só os códigos inteiros dos grupos presentes
+    # (linhas sem grupo têm código -1 e ficam de fora)
+    grupos = df[group_col].astype("category")
+    codigos = grupos.cat.codes.to_numpy()
+    presentes = np.unique(codigos[codigos >= 0])
+
+    # As três reduções (respostas válidas, notas >= 4 e soma das notas) saem de um
+    # único produto matricial: indicadora de grupo (grupos x linhas) pelos três blocos
+    # lado a lado (linhas x 3 colunas), em uma só passada sobre os dados
+    validos = ~np.isnan(valores)
+    blocos = np.hstack([validos, valores >= 4, np.where(validos, valores, 0)]).astype(np.float32)
+    indicadora = (codigos == presentes[:, None]).astype(np.float32)
+    reducoes = (indicadora @ blocos).astype(np.float64)
+    indice_grupos = grupos.cat.categories[presentes]
+    totais, altos, somas = (
+        pd.DataFrame(bloco, index=indice_grupos, columns=colunas)
+        for bloco in np.split(reducoes, 3, axis=1)
+    )
 
-    resultado = pd.DataFrame(registros)
+    # Formato longo (grupo, coluna) das três reduções, apenas pares com respostas válidas
+    metricas = pd.DataFrame({"total": totais.stack(), "altos": altos.stack(), "soma": somas.stack()})
+    metricas = metricas[metricas["total"] > 0]
+    if metricas.empty:
+        return pd.DataFrame()
+    metricas = metricas.rename_axis(["grupo", "coluna"]).reset_index()
+
+    # Metadados de cada coluna de risco, unidos pelo nome da coluna
+    metadados = pd.DataFrame(
+        [(col, meta.code, meta.dimension, meta.label, meta.period) for col, meta in risk_columns.items()],
+        columns=["coluna", "codigo", "dimensao", "risco", "periodo"],
+    ).set_index("coluna")
+    metricas = metricas.join(metadados, on="coluna")
+
+    total = metricas["total"].to_numpy()
+    pct = metricas["altos"].to_numpy() / total * 100.0
+    media = metricas["soma"].to_numpy() / total
+
+    resultado = pd.DataFrame(
+        {
+            group_label: [str(valor).strip() for valor in metricas["grupo"].tolist()],
+            "codigo": metricas["codigo"],
+            "dimensao": metricas["dimensao"],
+            "risco": metricas["risco"],
+            "periodo": metricas["periodo"],
+            "percentual_risco_alto": [round(valor, 2) for valor in pct.tolist()],
+            "media_likert": [round(valor, 2) for valor in media.tolist()],
+            "respostas_validas": total.astype(int),
+        }
+    )
     resultado["ranking"] = (
         resultado.groupby(group_label)["percentual_risco_alto"]
         .rank(method="first", ascending=False)
@@ -216,7 +234,8 @@ def export_table_formats(
     Salva a tabela em CSV, Markdown e HTML e retorna caminhos gerados.
     """
     outputs: Dict[str, Path] = {}
-    df_export = df[columns].rename(columns=rename_map).copy()
+    # rename já devolve um DataFrame novo; não é preciso copiar de novo
+    df_export = df[columns].rename(columns=rename_map)
 
     csv_path = base_path.with_suffix(".csv")
     df_export.to_csv(csv_path, index=False)
@@ -243,18 +262,19 @@ def criar_tabelas_apendice(
         - Top riscos por tipo de instalação portuária.
         - Top riscos por região (UF agregadas).
     """
-    df = pd.read_excel(excel_path)
+    df = ler_excel_com_cache(excel_path)
 
+    # Nomes em minúsculas calculados uma única vez para as buscas abaixo
+    nomes_minusculos = {col: col.lower() for col in df.columns}
     col_tipo_instalacao = next(
-        col for col in df.columns if "instala" in col.lower() and "portu" in col.lower()
+        col for col, nome in nomes_minusculos.items() if "instala" in nome and "portu" in nome
     )
-    col_uf = next(col for col in df.columns if "estado" in col.lower())
+    col_uf = next(col for col, nome in nomes_minusculos.items() if "estado" in nome)
 
     # Seleciona apenas as colunas do período Imediato (2025)
+    colunas_imediatas = [col for col in df.columns if IMMEDIATE_TAG in col]
     risk_cols: Dict[str, RiskColumn] = {}
-    for col in df.columns:
-        if IMMEDIATE_TAG not in col:
-            continue
+    for col in colunas_imediatas:
         meta = extract_risk_metadata(col)
         if meta:
             risk_cols[col] = meta
@@ -262,9 +282,10 @@ def criar_tabelas_apendice(
     if not risk_cols:
         raise RuntimeError("Nenhuma coluna de risco do período 'Imediato (2025)' foi identificada.")
 
-    # Calcula tabelas por tipo de instalação
+    # Calcula tabelas por tipo de instalação (compute_group_table só lê as colunas
+    # de risco e a de agrupamento, então recebe o próprio DataFrame, sem cópia)
     tabela_portos = compute_group_table(
-        df[[col_tipo_instalacao, *risk_cols.keys()]].copy(),
+        df,
         group_col=col_tipo_instalacao,
         group_label="tipo_instalacao",
         risk_columns=risk_cols,
@@ -273,17 +294,12 @@ def criar_tabelas_apendice(
     if tabela_portos.empty:
         raise RuntimeError("Não foi possível calcular a tabela por tipo de instalação.")
 
-    tabela_portos = (
-        tabela_portos.groupby("tipo_instalacao")
-        .head(top_n)
-        .reset_index(drop=True)
-    )
+    tabela_portos = tabela_portos[tabela_portos["ranking"] <= top_n].reset_index(drop=True)
 
-    # Prepara dados de região a partir da UF
-    df_regiao = df[[col_uf, *risk_cols.keys()]].copy()
-    df_regiao["uf"] = df_regiao[col_uf].apply(normalize_uf)
-    df_regiao["regiao"] = df_regiao["uf"].map(STATE_TO_REGION)
-    df_regiao = df_regiao.dropna(subset=["regiao"])
+    # Prepara dados de região a partir da UF; só as linhas com região são copiadas
+    regiao = normalize_uf(df[col_uf]).map(STATE_TO_REGION_SERIES)
+    com_regiao = regiao.notna()
+    df_regiao = df.loc[com_regiao, list(risk_cols)].assign(regiao=regiao[com_regiao])
 
     tabela_regioes = compute_group_table(
         df_regiao,
@@ -295,11 +311,7 @@ def criar_tabelas_apendice(
     if tabela_regioes.empty:
         raise RuntimeError("Não foi possível calcular a tabela agregada por região.")
 
-    tabela_regioes = (
-        tabela_regioes.groupby("regiao")
-        .head(top_n)
-        .reset_index(drop=True)
-    )
+    tabela_regioes = tabela_regioes[tabela_regioes["ranking"] <= top_n].reset_index(drop=True)
 
     # Exporta arquivos
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -1,9 +1,14 @@
-﻿from analise_likert_riscos import AnalisadorRiscosLikert
-from pathlib import Path
-
-analisador = AnalisadorRiscosLikert()
-analisador.carregar_dados()
-cols = [c for c in analisador.dados_brutos.columns if str(c).startswith('5.2')]
-for c in cols:
-    print(repr(c))
-    print('len:', len(c))
+﻿import pandas as pd
+
+
+def main():
+    # Só os nomes das colunas interessam: lê apenas o cabeçalho da planilha
+    colunas = pd.read_excel('questionario.xlsx', nrows=0).columns
+    cols = [c for c in colunas if str(c).startswith('5.2')]
+    for c in cols:
+        print(repr(c))
+        print('len:', len(c))
+
+
+if __name__ == '__main__':
+    main()
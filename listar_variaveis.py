@@ -4,11 +4,11 @@
 
 import pandas as pd
 
-# Carregar dados
-df = pd.read_excel("questionario.xlsx")
+# Só os nomes das colunas são listados: lê apenas o cabeçalho da planilha
+colunas = pd.read_excel("questionario.xlsx", nrows=0).columns
 
 # Encontrar colunas de curto prazo
-curto_cols = [c for c in df.columns if '[Curto prazo' in c]
+curto_cols = [c for c in colunas if '[Curto prazo' in c]
 
 print("=== VARIÁVEIS DE CURTO PRAZO ===")
 for i, col in enumerate(curto_cols, 1):
@@ -5,10 +5,10 @@ Script para regerar apenas o gráfico 5.4 com o título correto
 
 import sys
 import os
-import shutil
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from analise_likert_riscos import AnalisadorRiscosLikert, carregar_dados
+from _publicacao import publicar_grafico
 import pandas as pd
 import logging
 
@@ -66,7 +66,7 @@ def criar_grafico_54_corrigido():
         if sucesso:
             print(f"Gráfico 5.4 gerado com sucesso: {caminho_completo}")
             
-            # Copiar para os locais corretos
+            # Publicar nos locais corretos (hard link; cópia só entre dispositivos)
             destinos = [
                 'quarto/assets/tecnologicos/grafico_agrupado_5_4_temporal.png',
                 'quarto/assets/graficos_agrupados/grafico_agrupado_5_4_temporal.png'
@@ -74,8 +74,8 @@ def criar_grafico_54_corrigido():
             
             for destino in destinos:
                 os.makedirs(os.path.dirname(destino), exist_ok=True)
-                shutil.copy2(caminho_completo, destino)
-                print(f"Copiado para: {destino}")
+                publicar_grafico(caminho_completo, destino)
+                print(f"Publicado em: {destino}")
             
             return True
         else:
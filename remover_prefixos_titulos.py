@@ -6,50 +6,35 @@ Remove padrões como "### 4.1 Título" para "### Título"
 
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Títulos com prefixos numéricos, como ### 4.1 Título, ## 1.2 Título, etc.
+PADRAO_TITULO_NUMERADO = re.compile(r'^(#{1,6})\s+\d+\.\d+\s+(.+)$', re.MULTILINE)
+
 def remover_prefixos_titulos(arquivo_path):
     """
     Remove prefixos numéricos dos títulos em um arquivo .qmd
+
+    Returns:
+        Tupla (arquivo_path, número de títulos corrigidos); erros de leitura ou
+        escrita são propagados para quem chamou
     """
-    try:
-        # Ler o arquivo
-        with open(arquivo_path, 'r', encoding='utf-8') as f:
-            conteudo = f.read()
-        
-        # Backup do conteúdo original
-        conteudo_original = conteudo
-        
-        # Padrão regex para encontrar títulos com prefixos numéricos
-        # Captura títulos como ### 4.1 Título, ## 1.2 Título, etc.
-        padrao = r'^(#{1,6})\s+\d+\.\d+\s+(.+)$'
-        
-        # Substituir os títulos removendo os prefixos numéricos
-        def substituir_titulo(match):
-            nivel = match.group(1)  # ###, ##, etc.
-            titulo = match.group(2)  # Título sem o prefixo
-            return f"{nivel} {titulo}"
-        
-        # Aplicar a substituição em todo o conteúdo
-        conteudo_modificado = re.sub(padrao, substituir_titulo, conteudo, flags=re.MULTILINE)
-        
-        # Verificar se houve alterações
-        if conteudo_modificado != conteudo_original:
-            # Salvar o arquivo modificado
-            with open(arquivo_path, 'w', encoding='utf-8') as f:
-                f.write(conteudo_modificado)
-            
-            # Contar quantas alterações foram feitas
-            alteracoes = len(re.findall(padrao, conteudo_original, flags=re.MULTILINE))
-            print(f"✅ {arquivo_path}: {alteracoes} títulos corrigidos")
-            return alteracoes
-        else:
-            print(f"⏭️  {arquivo_path}: Nenhuma alteração necessária")
-            return 0
-            
-    except Exception as e:
-        print(f"❌ Erro ao processar {arquivo_path}: {str(e)}")
-        return 0
+    # Ler o arquivo
+    with open(arquivo_path, 'r', encoding='utf-8') as f:
+        conteudo = f.read()
+    
+    # Substituir os títulos removendo os prefixos numéricos (###, ##, etc. + título),
+    # contando as alterações na mesma passada
+    conteudo_modificado, alteracoes = PADRAO_TITULO_NUMERADO.subn(r'\1 \2', conteudo)
+    
+    # Verificar se houve alterações
+    if alteracoes > 0:
+        # Salvar o arquivo modificado
+        with open(arquivo_path, 'w', encoding='utf-8') as f:
+            f.write(conteudo_modificado)
+    
+    return arquivo_path, alteracoes
 
 def main():
     """
@@ -69,10 +54,23 @@ def main():
     
     total_alteracoes = 0
     
-    # Processar cada arquivo
-    for arquivo in sorted(arquivos_qmd):
-        alteracoes = remover_prefixos_titulos(arquivo)
-        total_alteracoes += alteracoes
+    # Processar os arquivos em paralelo (leitura, regex e escrita independentes por arquivo);
+    # o relatório de cada arquivo é impresso aqui, na ordem alfabética
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futuros = [(arquivo, executor.submit(remover_prefixos_titulos, arquivo))
+                   for arquivo in sorted(arquivos_qmd)]
+        for arquivo, futuro in futuros:
+            try:
+                arquivo, alteracoes = futuro.result()
+            except Exception as e:
+                print(f"❌ Erro ao processar {arquivo}: {str(e)}")
+                continue
+            
+            if alteracoes > 0:
+                print(f"✅ {arquivo}: {alteracoes} títulos corrigidos")
+            else:
+                print(f"⏭️  {arquivo}: Nenhuma alteração necessária")
+            total_alteracoes += alteracoes
     
     print("=" * 60)
     print(f"📊 Resumo: {total_alteracoes} títulos corrigidos em {len(arquivos_qmd)} arquivos")
@@ -4,9 +4,11 @@ Teste simplificado para verificar a análise Likert
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # gráficos só em arquivo; sem sondagem de backend gráfico
 import matplotlib.pyplot as plt
 import os
-from analise_likert_riscos import AnalisadorRiscosLikert
+from _cache_dados import obter_analisador, obter_mapeamento
 
 def test_analise_simplificada():
     """Teste simplificado para verificar funcionamento"""
@@ -15,17 +17,14 @@ def test_analise_simplificada():
     print("=" * 50)
     
     try:
-        # Criar analisador
-        analisador = AnalisadorRiscosLikert()
-        
-        # Carregar dados
+        # Carregar dados (analisador compartilhado, lido uma única vez por processo)
         print("1. Carregando dados...")
-        analisador.carregar_dados()
+        analisador = obter_analisador()
         print(f"   Dados carregados: {analisador.dados_brutos.shape}")
         
         # Mapear variáveis
         print("2. Mapeando variáveis...")
-        mapeamento = analisador.mapear_variaveis_por_dimensao()
+        mapeamento = obter_mapeamento()
         
         # Mostrar resumo
         print("\nRESUMO DO MAPEAMENTO:")
@@ -3,44 +3,62 @@
 Script para verificar os nomes exatos das colunas no arquivo Excel
 """
 
+import re
+import sys
+import zipfile
+from itertools import islice
+
 import pandas as pd
 
+# Marcadores de período procurados nos nomes das colunas, na ordem de exibição
+PERIODOS = ['2025', '2026', '2027', '2035', 'Imediato', 'Curto', 'Longo']
+# Todos os marcadores em uma única expressão (nenhum é trecho de outro, então
+# findall encontra cada ocorrência)
+PADRAO_PERIODOS = re.compile('|'.join(map(re.escape, PERIODOS)))
+
 def verificar_colunas():
     """Verifica os nomes das colunas no arquivo Excel"""
     
+    # Só os nomes das colunas são verificados: lê apenas o cabeçalho da planilha
+    # (o openpyxl é aberto em modo somente leitura e para na primeira linha);
+    # os nomes são convertidos para texto uma única vez, de forma vetorizada.
+    # Apenas falhas de leitura do arquivo são tratadas aqui
     try:
-        # Carregar dados
-        df = pd.read_excel('questionario.xlsx')
-        
-        print("Colunas encontradas no arquivo Excel:")
-        print("=" * 80)
-        
-        # Filtrar apenas colunas que começam com "4."
-        colunas_sociais = [col for col in df.columns if str(col).startswith('4.')]
-        
-        for i, col in enumerate(colunas_sociais, 1):
-            print(f"{i:2d}. {col}")
-        
-        print(f"\nTotal de colunas sociais: {len(colunas_sociais)}")
-        
-        # Verificar se há colunas com períodos temporais
-        print("\nVerificando períodos temporais:")
-        print("-" * 40)
-        
-        periodos = ['2025', '2026', '2027', '2035', 'Imediato', 'Curto', 'Longo']
-        
-        for periodo in periodos:
-            colunas_periodo = [col for col in colunas_sociais if periodo in str(col)]
-            if colunas_periodo:
-                print(f"{periodo}: {len(colunas_periodo)} colunas")
-                for col in colunas_periodo[:3]:  # Mostrar apenas as 3 primeiras
-                    print(f"  - {col}")
-                if len(colunas_periodo) > 3:
-                    print(f"  ... e mais {len(colunas_periodo) - 3}")
-                print()
-        
-    except Exception as e:
+        colunas = pd.read_excel('questionario.xlsx', nrows=0).columns.astype(str)
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
         print(f"Erro: {e}")
+        return
+    
+    print("Colunas encontradas no arquivo Excel:")
+    print("=" * 80)
+    
+    # Filtrar apenas colunas que começam com "4."
+    colunas_sociais = colunas[colunas.str.startswith('4.')].tolist()
+    
+    # Lista escrita de uma só vez no stdout
+    sys.stdout.write("".join(f"{i:2d}. {col}\n" for i, col in enumerate(colunas_sociais, 1)))
+    
+    print(f"\nTotal de colunas sociais: {len(colunas_sociais)}")
+    
+    # Verificar se há colunas com períodos temporais
+    print("\nVerificando períodos temporais:")
+    print("-" * 40)
+    
+    # Uma única passada pelas colunas, distribuindo cada uma pelos períodos citados
+    colunas_por_periodo = {periodo: [] for periodo in PERIODOS}
+    for col in colunas_sociais:
+        for periodo in set(PADRAO_PERIODOS.findall(col)):
+            colunas_por_periodo[periodo].append(col)
+    
+    for periodo, colunas_periodo in colunas_por_periodo.items():
+        total_periodo = len(colunas_periodo)
+        if total_periodo:
+            print(f"{periodo}: {total_periodo} colunas")
+            for col in islice(colunas_periodo, 3):  # Mostrar apenas as 3 primeiras, sem copiar a lista
+                print(f"  - {col}")
+            if total_periodo > 3:
+                print(f"  ... e mais {total_periodo - 3}")
+            print()
 
 if __name__ == "__main__":
     verificar_colunas()
@@ -1,24 +1,22 @@
-from analise_likert_riscos import AnalisadorRiscosLikert
+import sys
 
-analisador = AnalisadorRiscosLikert()
-analisador.carregar_dados()
-mapeamento = analisador.mapear_variaveis_por_dimensao()
+from _cache_dados import obter_mapeamento
+
+# Mapeamento compartilhado (planilha lida e mapeada uma única vez por processo)
+mapeamento = obter_mapeamento()
 dados_sociais = mapeamento.get('Social', {})
 dados_imediato = dados_sociais.get('imediato_2025', [])
 
 print('Nomes das variáveis no período Imediato 2025:')
-for i, variavel in enumerate(dados_imediato):
-    print(f'{i+1}: "{variavel}"')
-    
+# Lista escrita de uma só vez no stdout
+sys.stdout.write(''.join(f'{i+1}: "{variavel}"\n' for i, variavel in enumerate(dados_imediato)))
 print(f'\nTotal de variáveis: {len(dados_imediato)}')
 
 # Verificar formato específico da variável 4.3
 print('\n' + '='*50)
 print('ANÁLISE ESPECÍFICA DA VARIÁVEL 4.3:')
-for variavel in dados_imediato:
-    if variavel.startswith('4.3'):
-        print(f'Nome completo: "{variavel}"')
-        print(f'Contém "[Imediato (2025)]": {"[Imediato (2025)]" in variavel}')
-        print(f'Contém "[Imediato_2025_]": {"[Imediato_2025_]" in variavel}')
-        print(f'Contém "Imediato": {"Imediato" in variavel}')
-        break
+variavel = next((v for v in dados_imediato if v.startswith('4.3')), None)
+if variavel is not None:
+    print(f'Nome completo: "{variavel}"')
+    for marcador in ('[Imediato (2025)]', '[Imediato_2025_]', 'Imediato'):
+        print(f'Contém "{marcador}": {marcador in variavel}')